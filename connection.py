@@ -1,10 +1,97 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from db.migrations import migrate
+
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "invoicing.db"
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000
+MMAP_SIZE = 256 * 1024 * 1024
+
+# One long-lived connection per thread (Streamlit runs each session's
+# script on its own thread; sqlite3 connections must not cross threads).
+_local = threading.local()
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _connect():
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None
+    )
     conn.row_factory = sqlite3.Row
+
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+    _ensure_schema(conn)
+    return conn
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+
+    if _schema_ready:
+        return
+
+    with _schema_lock:
+        if not _schema_ready:
+            migrate(conn)
+            _schema_ready = True
+
+
+def get_connection():
+    """
+    Return this thread's shared connection, opening it on first use.
+
+    The connection runs in autocommit mode: plain reads need no commit,
+    writes that must be atomic go through transaction().
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
     return conn
 
+
+@contextmanager
+def transaction():
+    """
+    Run the block as one write transaction on this thread's connection.
+
+    Nested use joins the outer transaction, so helpers can be composed
+    into a single unit of work that commits (or rolls back) once.
+    """
+    conn = get_connection()
+
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
@@ -1,49 +1,145 @@
-import sqlite3 
-from db.connection import get_connection
+import re
+import threading
+from itertools import islice
 
+from db.connection import get_connection, transaction
+
+
+# ---------------- CUSTOMER MAP CACHE ----------------
+# Process-wide name -> customer map for the estimate page's selectbox.
+# Reloaded only when the 'customers' data version (bumped by triggers on
+# every write) changes. Cached records are shared - copy before modifying.
+_customers_lock = threading.Lock()
+_customers = {"version": None, "by_name": {}, "names": []}
+
+
+def get_customer_map():
+    """Return {"version", "by_name", "names"} for the current customers."""
+    global _customers
 
-def get_customer_names():
     conn = get_connection()
-    rows = conn.execute(
-        "SELECT name FROM customers ORDER BY name"
-    ).fetchall()
-    conn.close()
-    return [row["name"] for row in rows]
+    version = conn.execute(
+        "SELECT version FROM data_versions WHERE name = 'customers'"
+    ).fetchone()["version"]
+
+    customers = _customers
+    if customers["version"] == version:
+        return customers
+
+    with _customers_lock:
+        if _customers["version"] != version:
+            rows = conn.execute("""
+                SELECT id, name, phone, address
+                FROM customers
+                ORDER BY name
+            """).fetchall()
+
+            by_name = {row["name"]: dict(row) for row in rows}
+            _customers = {
+                "version": version,
+                "by_name": by_name,
+                "names": list(by_name)
+            }
+
+        return _customers
+
+
+def get_customer_names():
+    return list(get_customer_map()["names"])
 
 
 def get_customer(name):
-    conn = get_connection()
-    row = conn.execute(
-        "SELECT * FROM customers WHERE name = ?",
-        (name,)
-    ).fetchone()
-    conn.close()
-    return dict(row) if row else None
+    customer = get_customer_map()["by_name"].get(name)
+    return dict(customer) if customer else None
+
+# ---------------- NORMALIZED KEYS (DEDUPE) ----------------
+def normalize_name(name):
+    """Case-, spacing- and punctuation-insensitive key: "R.  Kumar " -> "r kumar"."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(name or "")).casefold().split())
+
+
+def normalize_phone(phone):
+    """Digits only, without a +91 / 0 prefix; None when there are no digits."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    return digits[-10:] or None
 
-def customer_exists(name):
+
+def customer_exists(name, exclude_id=None):
+    """True if another customer (not `exclude_id`, when editing) has the same normalized name."""
     conn = get_connection()
     row = conn.execute(
-        "SELECT 1 FROM customers WHERE name = ?",
-        (name,)
+        "SELECT 1 FROM customers WHERE name_key = ? AND id IS NOT ?",
+        (normalize_name(name), exclude_id)
     ).fetchone()
-    conn.close()
     return row is not None
 
 def add_customer(name, phone, address):
-    conn = get_connection()
-    conn.execute(
-        """
-        INSERT INTO customers (name, phone, address)
-        VALUES (?, ?, ?)
-        """,
-        (name, phone, address)
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO customers (name, phone, address, name_key, phone_key)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (name, phone, address, normalize_name(name), normalize_phone(phone))
+        )
+
+def resolve_or_create_customer(name, phone, address):
+    """
+    Return the id of the customer called `name`, creating it if needed.
+
+    The name is matched on its normalized key like customer_exists(), so
+    "suresh kumar" reuses "Suresh Kumar" (an exact spelling wins if the
+    key is shared). An existing customer only has its phone / address
+    filled in when new non-empty values are given. Joins the caller's
+    transaction (e.g. the estimate save).
+    """
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT id
+            FROM customers
+            WHERE name_key = ?
+            ORDER BY name = ? DESC, id
+            LIMIT 1
+            """,
+            (normalize_name(name), name)
+        ).fetchone()
+
+        if row is None:
+            return conn.execute(
+                """
+                INSERT INTO customers (name, phone, address, name_key, phone_key)
+                VALUES (?, ?, ?, ?, ?)
+                RETURNING id
+                """,
+                (name, phone, address, normalize_name(name), normalize_phone(phone))
+            ).fetchone()["id"]
+
+        conn.execute(
+            """
+            UPDATE customers SET
+                phone = COALESCE(NULLIF(:phone, ''), phone),
+                phone_key = CASE
+                    WHEN NULLIF(:phone, '') IS NULL THEN phone_key
+                    ELSE :phone_key
+                END,
+                address = COALESCE(NULLIF(:address, ''), address)
+            WHERE id = :id
+              AND (COALESCE(NULLIF(:phone, ''), phone) IS NOT phone
+                   OR COALESCE(NULLIF(:address, ''), address) IS NOT address)
+            """,
+            {
+                "id": row["id"],
+                "phone": phone,
+                "phone_key": normalize_phone(phone),
+                "address": address
+            }
+        )
+
+    return row["id"]
 
 def get_all_customers():
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
     rows = conn.execute("""
         SELECT id, name, phone, address
@@ -51,22 +147,72 @@ def get_all_customers():
         ORDER BY name
     """).fetchall()
 
-    conn.close()
     return [dict(row) for row in rows]
 
 
+def _customer_search_clause(term):
+    """
+    WHERE clause + params for a customer search term.
+
+    Terms of 3+ characters use the trigram index (substring match on
+    name, phone, digits-only phone and address); shorter ones fall back
+    to a name prefix match.
+    """
+    term = (term or "").strip()
+
+    if not term:
+        return "", []
+
+    if len(term) >= 3:
+        quoted = '"' + term.replace('"', '""') + '"'
+        return (
+            "WHERE id IN (SELECT rowid FROM customer_search WHERE customer_search MATCH ?)",
+            [quoted]
+        )
+
+    return "WHERE name LIKE ? ESCAPE '\\'", [_like_escape(term) + "%"]
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_customers(term, limit=50, offset=0):
+    conn = get_connection()
+    where, params = _customer_search_clause(term)
+
+    rows = conn.execute(f"""
+        SELECT id, name, phone, address
+        FROM customers
+        {where}
+        ORDER BY name
+        LIMIT ? OFFSET ?
+    """, [*params, limit, offset]).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def count_customers(term=None):
+    conn = get_connection()
+    where, params = _customer_search_clause(term)
+
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM customers {where}",
+        params
+    ).fetchone()
+    return row[0]
+
+
 def get_customer_id(name):
     conn = get_connection()
     row = conn.execute(
         "SELECT id FROM customers WHERE name = ?",
         (name,)
     ).fetchone()
-    conn.close()
     return row["id"] if row else None
 
 def get_customer_by_id(customer_id):
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
     row = conn.execute("""
         SELECT id, name, phone, address
@@ -74,32 +220,128 @@ def get_customer_by_id(customer_id):
         WHERE id = ?
     """, (customer_id,)).fetchone()
 
-    conn.close()
-    return dict(row) if row else None 
+    return dict(row) if row else None
 
 def update_customer(customer_id, name, phone, address):
-    conn = get_connection()
-    cur = conn.cursor()
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE customers SET
+                name = ?,
+                phone = ?,
+                address = ?,
+                name_key = ?,
+                phone_key = ?
+            WHERE id = ?
+        """, (
+            name, phone, address,
+            normalize_name(name), normalize_phone(phone),
+            customer_id
+        ))
 
-    cur.execute("""
-        UPDATE customers SET
-            name = ?,
-            phone = ?,
-            address = ?
-        WHERE id = ?
-    """, (name, phone, address, customer_id))
+def delete_customer(customer_id):
+    with transaction() as conn:
+        conn.execute(
+            "DELETE FROM customers WHERE id = ?",
+            (customer_id,)
+        )
 
-    conn.commit()
-    conn.close() 
 
-def delete_customer(customer_id):
+# ---------------- BULK IMPORT / EXPORT ----------------
+IMPORT_CHUNK_SIZE = 500
+
+
+def _insert_customer_chunk(conn, chunk, seen_names, seen_phones):
+    keyed = [
+        (name, phone, address, normalize_name(name), normalize_phone(phone))
+        for name, phone, address in chunk
+    ]
+
+    name_keys = list({row[3] for row in keyed})
+    phone_keys = list({row[4] for row in keyed if row[4]})
+
+    # Both lookups are served by the name_key / phone_key indexes
+    for row in conn.execute(f"""
+        SELECT name_key, phone_key
+        FROM customers
+        WHERE name_key IN ({", ".join("?" for _ in name_keys)})
+           OR phone_key IN ({", ".join("?" for _ in phone_keys)})
+    """, name_keys + phone_keys):
+        seen_names.add(row["name_key"])
+        if row["phone_key"]:
+            seen_phones.add(row["phone_key"])
+
+    new_rows = []
+    shared_phone = 0
+    for row in keyed:
+        name_key, phone_key = row[3], row[4]
+        if name_key in seen_names:
+            continue
+
+        # Family members or a firm and its owner may share a number:
+        # still a new customer, only counted so the import can say so
+        if phone_key and phone_key in seen_phones:
+            shared_phone += 1
+
+        # Later rows of the same file are checked against this one too
+        seen_names.add(name_key)
+        if phone_key:
+            seen_phones.add(phone_key)
+        new_rows.append(row)
+
+    conn.executemany("""
+        INSERT INTO customers (name, phone, address, name_key, phone_key)
+        VALUES (?, ?, ?, ?, ?)
+    """, new_rows)
+
+    return len(new_rows), len(keyed) - len(new_rows), shared_phone
+
+
+def import_customers(rows, chunk_size=IMPORT_CHUNK_SIZE, summary=None):
+    """
+    Add customers from an iterable of (name, phone, address) tuples.
+
+    A row is a duplicate - and skipped - when its normalized name matches
+    an existing customer or an earlier row of the import. New customers
+    whose phone is already in use are added and counted in
+    "shared_phone". Rows are consumed lazily and written in chunks, one
+    transaction and one executemany() per chunk. Returns
+    {"inserted", "duplicates", "shared_phone"} counts; pass `summary` to
+    have them added as each chunk commits, so it still tells what was
+    saved if a later chunk (or reading the file) fails.
+    """
+    if summary is None:
+        summary = {}
+    for key in ("inserted", "duplicates", "shared_phone"):
+        summary.setdefault(key, 0)
+    seen_names, seen_phones = set(), set()
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        with transaction() as conn:
+            counts = _insert_customer_chunk(conn, chunk, seen_names, seen_phones)
+
+        for key, count in zip(summary, counts):
+            summary[key] += count
+
+    return summary
+
+
+def iter_customers(batch_size=500):
+    """Yield (name, phone, address) for every customer, ordered by name, in fetchmany() batches."""
     conn = get_connection()
-    cur = conn.cursor()
 
-    cur.execute(
-        "DELETE FROM customers WHERE id = ?",
-        (customer_id,)
-    )
+    cur = conn.execute("""
+        SELECT name, phone, address
+        FROM customers
+        ORDER BY name
+    """)
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
@@ -1,18 +1,54 @@
 import streamlit as st
+import math
 from db.customer_db import (
     add_customer,
-    get_all_customers,
+    search_customers,
+    count_customers,
     customer_exists,
     get_customer_by_id,
     update_customer,
-    delete_customer
+    delete_customer,
+    import_customers,
+    iter_customers
 )
+from utilities.spreadsheet_utils import MIME_TYPES, read_records, write_rows
+
+
+PAGE_SIZE = 50
+CUSTOMER_COLUMNS = ["Customer Name", "Phone", "Address"]
+MAX_REJECTED_SHOWN = 100
+
+
+def _cell_text(value):
+    # Excel stores phone numbers as numbers: 9876543210.0 -> "9876543210"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value if value is not None else "").strip()
+
+
+def _valid_customer_rows(records, rejected):
+    """
+    Yield (name, phone, address) tuples from read_records(). Rows without
+    a name are counted in rejected["count"] and the first
+    MAX_REJECTED_SHOWN kept in rejected["rows"] as (row, reason).
+    """
+    for row_number, record in records:
+        name = " ".join(_cell_text(record["Customer Name"]).split())
+        if not name:
+            rejected["count"] += 1
+            if len(rejected["rows"]) < MAX_REJECTED_SHOWN:
+                rejected["rows"].append((row_number, "Customer Name is empty"))
+            continue
+
+        yield name, _cell_text(record["Phone"]), _cell_text(record["Address"])
 
 
 def show():
     st.header("Customers")
 
-    tab_add, tab_list = st.tabs(["➕ Add / Edit Customer", "📋 Customer List"])
+    tab_add, tab_list, tab_ie = st.tabs(
+        ["➕ Add / Edit Customer", "📋 Customer List", "📥 Import / 📤 Export"]
+    )
 
     # ---------- ADD / EDIT CUSTOMER ----------
     with tab_add:
@@ -45,6 +81,10 @@ def show():
                 st.error("Customer name is required")
                 return
 
+            if customer_exists(name.strip(), exclude_id=st.session_state.get("edit_customer_id")):
+                st.warning("Customer already exists")
+                return
+
             if editing:
                 update_customer(
                     customer_id=st.session_state.edit_customer_id,
@@ -55,10 +95,6 @@ def show():
                 del st.session_state.edit_customer_id
                 st.success("Customer updated successfully")
             else:
-                if customer_exists(name.strip()):
-                    st.warning("Customer already exists")
-                    return
-
                 add_customer(
                     name=name.strip(),
                     phone=phone.strip(),
@@ -68,29 +104,107 @@ def show():
 
             st.rerun()
 
+    # ---------- IMPORT / EXPORT ----------
+    with tab_ie:
+        col_imp, col_exp = st.columns(2)
+
+        # ---- IMPORT ----
+        with col_imp:
+            st.subheader("Import Customers")
+
+            uploaded_file = st.file_uploader(
+                "Upload Excel / CSV File",
+                type=["xlsx", "csv"],
+                help="Columns: " + ", ".join(CUSTOMER_COLUMNS)
+            )
+
+            if uploaded_file is not None and st.button("📥 Import Customers"):
+                rejected = {"count": 0, "rows": []}
+                records = read_records(uploaded_file, uploaded_file.name, CUSTOMER_COLUMNS)
+
+                summary = {}
+                try:
+                    with st.spinner("Importing customers..."):
+                        import_customers(_valid_customer_rows(records, rejected), summary=summary)
+                except Exception as e:
+                    # Chunks commit as they go - say what is already saved
+                    st.error(f"Import stopped: {e}. Please use correct template.")
+                    st.warning(
+                        f"Saved before the error: {summary.get('inserted', 0)} added, "
+                        f"{summary.get('duplicates', 0)} duplicates skipped, "
+                        f"{rejected['count']} rejected"
+                    )
+                else:
+                    st.success(
+                        f"Import complete: {summary['inserted']} added, "
+                        f"{summary['duplicates']} duplicates skipped, "
+                        f"{rejected['count']} rejected"
+                    )
+
+                if summary.get("shared_phone"):
+                    st.info(
+                        f"{summary['shared_phone']} added customer(s) share a phone "
+                        "number with another customer - check for duplicates."
+                    )
+
+                if rejected["rows"]:
+                    st.warning(f"Rejected rows (first {MAX_REJECTED_SHOWN}):")
+                    st.table([
+                        {"Row": row_number, "Reason": reason}
+                        for row_number, reason in rejected["rows"]
+                    ])
+
+        # ---- EXPORT ----
+        with col_exp:
+            st.subheader("Export Customers")
+
+            export_format = st.radio(
+                "Format",
+                ["xlsx", "csv"],
+                format_func=lambda f: "Excel (.xlsx)" if f == "xlsx" else "CSV",
+                horizontal=True,
+                key="customer_export_format"
+            )
+
+            if st.button("📤 Export Customers", key="customer_export_btn"):
+                data = write_rows(iter_customers(), CUSTOMER_COLUMNS, export_format, sheet_name="Customers")
+
+                st.download_button(
+                    "📤 Download Customers",
+                    data=data,
+                    file_name=f"customers.{export_format}",
+                    mime=MIME_TYPES[export_format],
+                    key="customer_export_download"
+                )
+
     # ---------- CUSTOMER LIST ----------
     with tab_list:
         st.subheader("Customer List")
 
-        customers = get_all_customers()
+        search = st.text_input("🔍 Search (name / phone / address)")
 
-        if not customers:
-            st.info("No customers found")
-            return
+        # ---- Reset to the first page whenever the search changes ----
+        if st.session_state.get("customer_search") != search:
+            st.session_state.customer_search = search
+            st.session_state.customer_page = 0
 
-        search = st.text_input("🔍 Search (name / phone / address)")
+        total = count_customers(search)
 
-        if search:
-            s = search.lower()
-            customers = [
-                c for c in customers
-                if s in c["name"].lower()
-                or s in (c["phone"] or "").lower()
-                or s in (c["address"] or "").lower()
-            ]
+        # Deletes can empty the last page - clamp back into range
+        page = min(st.session_state.customer_page, max(0, math.ceil(total / PAGE_SIZE) - 1))
+        st.session_state.customer_page = page
+
+        customers = search_customers(
+            search,
+            limit=PAGE_SIZE,
+            offset=page * PAGE_SIZE
+        )
 
         if not customers:
-            st.warning("No matching customers")
+            if search:
+                st.warning("No matching customers")
+            else:
+                st.info("No customers found")
             return
 
         h1, h2, h3, h4 = st.columns([3, 2, 3, 2])
@@ -118,6 +232,28 @@ def show():
             if e2.button("❌", key=f"del_cust_{cust['id']}"):
                 st.session_state.delete_customer_id = cust["id"]
 
+        # ---------- PAGINATION ----------
+        st.divider()
+
+        p1, p2, p3 = st.columns([1, 3, 1])
+
+        if p1.button("◀ Prev", key="customer_page_prev", disabled=page == 0):
+            st.session_state.customer_page -= 1
+            st.rerun()
+
+        p2.write(
+            f"Page {page + 1} of {max(1, math.ceil(total / PAGE_SIZE))} "
+            f"({total} customers)"
+        )
+
+        if p3.button(
+            "Next ▶",
+            key="customer_page_next",
+            disabled=(page + 1) * PAGE_SIZE >= total
+        ):
+            st.session_state.customer_page += 1
+            st.rerun()
+
         # ---------- DELETE CONFIRMATION ----------
         if "delete_customer_id" in st.session_state:
             st.warning("Are you sure you want to delete this customer?")
@@ -2,28 +2,41 @@ import streamlit as st
 import os
 from datetime import date
 
-from utilities.pdf_generator_utils import generate_estimate_pdf
-from db.item_db import get_item_names, get_item
-from db.estimate_db import save_estimate_header, update_estimate_header , delete_estimate_items , get_next_estimate_no, estimate_exists, get_estimate_by_id , save_estimate_items
+from utilities.pdf_worker import submit_render, get_estimate_pdf
+from db.item_db import get_item_names, get_items
+from db.estimate_db import save_estimate , get_next_estimate_no, get_estimate_by_id, get_pdf_status
  
 
 from db.customer_db import (
     get_customer_names,
-    get_customer_id, 
-    get_customer, 
-    customer_exists,
-    add_customer
+    get_customer
 ) 
 
+# Session keys holding the form, dropped by "New Estimate"
+FORM_KEYS = [
+    "est_items",
+    "auto_charge",
+    "discount",
+    "hamali_adjustment",
+    "selected_customer",
+    "customer_name_input",
+    "customer_mode"
+]
+
+
+def _clear_saved_pdf():
+    st.session_state.pop("last_saved_estimate_id", None)
+    st.session_state.pop("last_saved_pdf", None)
+
+
+def _start_new_estimate():
+    for key in FORM_KEYS:
+        st.session_state.pop(key, None)
+    _clear_saved_pdf()
+
 
 
 def show():
-    
-    company_info = {
-        "name": "Sri Rama Steel & Cement",
-        "phone": "8885482288",
-        "address": "Warangal Road, Huzurabad"
-    }
 
     if "auto_charge" not in st.session_state:
         st.session_state.auto_charge = 0.0
@@ -35,6 +48,9 @@ def show():
         st.session_state.hamali_adjustment = 0.0
 
     if "edit_estimate_id" in st.session_state:
+        # Editing another estimate - the last save's PDF no longer applies
+        _clear_saved_pdf()
+
         header, items = get_estimate_by_id(st.session_state.edit_estimate_id)
 
         # Header fields
@@ -75,8 +91,11 @@ def show():
 
 
 
-    if "current_est_no" not in st.session_state:
-        st.session_state.current_est_no = get_next_estimate_no()
+    # New estimates only get their number when saved; show the likely one
+    if "edit_estimate_id" in st.session_state:
+        display_est_no = st.session_state.current_est_no
+    else:
+        display_est_no = get_next_estimate_no()
 
     # ---------------- Estimate Details ----------------
     st.markdown("### Estimate Details")
@@ -85,8 +104,9 @@ def show():
     with col1:
         est_no = st.text_input(
             "Estimate No",
-            value=st.session_state.current_est_no,
-            disabled=True
+            value=display_est_no,
+            disabled=True,
+            help="Final number is assigned when the estimate is saved"
         )
 
     with col2:
@@ -226,6 +246,7 @@ def show():
     hamali_grand_total = 0.0
 
     item_names = [""] + get_item_names()
+    item_positions = {name: pos for pos, name in enumerate(item_names)}
 
     for i, row in enumerate(st.session_state.est_items):
         c1, c2, c3, c4, c5, c6, c7, c8, c9 = st.columns([3, 3, 1, 1.5, 2, 2, 2, 2, 1])
@@ -233,20 +254,25 @@ def show():
         selected_item = c1.selectbox(
             f"item_{i}",
             item_names,
-            index=item_names.index(row["item_name"])
-            if row["item_name"] in item_names else 0,
+            index=item_positions.get(row["item_name"], 0),
             label_visibility="collapsed"
         )
 
-        # Fetch from DB if item exists
-        if selected_item:
+        # Fill from the catalog only when the selection changed, so edits
+        # to the row (and rows loaded for editing) are kept across reruns
+        selection_changed = selected_item != row.get("_selected_item", row["item_name"])
+        row["_selected_item"] = selected_item
+
+        if selected_item and selection_changed:
             row["item_name"] = selected_item
-            item_data = get_item(selected_item)
 
-            row["desc"] = item_data["description"]
-            row["unit"] = item_data["unit"]
-            row["rate"] = item_data["rate"]
-            row["hamali_rate"] = item_data["hamali_rate"]
+            item_data = get_items([selected_item]).get(selected_item)
+
+            if item_data:
+                row["desc"] = item_data["description"]
+                row["unit"] = item_data["unit"]
+                row["rate"] = item_data["rate"]
+                row["hamali_rate"] = item_data["hamali_rate"]
 
         row["desc"] = c2.text_input(
             f"desc_{i}",
@@ -403,102 +429,84 @@ def show():
             st.error("Please enter customer name")
             return
 
-        # 🔒 Prevent duplicate ONLY for new estimates
-        if estimate_exists(st.session_state.current_est_no) and not is_editing:
-            st.warning("Estimate already saved. Opening existing PDF.")
-            return
-
         os.makedirs("bills", exist_ok=True)
-        pdf_path = f"bills/{st.session_state.current_est_no}.pdf"
-
-        # 1️⃣ Save customer ONLY on save
-        if st.session_state.customer_mode == "new":
-            if not customer_exists(customer_name):
-                add_customer(
-                    name=customer_name.strip(),
-                    phone=phone.strip(),
-                    address=address.strip()
-                )
-
-        # 2️⃣ Generate PDF
-        generate_estimate_pdf(
-            estimate={
-                "estimate_number": st.session_state.current_est_no,
-                "date": est_date
-            },
-            company_info=company_info,
-            customer={
+
+        # 1️⃣ Save estimate to DB - a new customer is created and new
+        # estimates get their number in the same transaction
+        header = {
+            "date": est_date,
+            "items_total": grand_total,
+            "hamali_total": final_hamali_total,
+            "auto_charge": st.session_state.auto_charge,
+            "discount": st.session_state.discount,
+            "grand_total": final_total
+        }
+
+        if is_editing:
+            header["id"] = st.session_state.edit_estimate_id
+            header["estimate_no"] = st.session_state.current_est_no
+
+        if customer_data:
+            header["customer_id"] = customer_data["id"]
+            new_customer = None
+        else:
+            new_customer = {
                 "name": customer_name.strip(),
                 "phone": phone.strip(),
                 "address": address.strip()
-            },
-            items=st.session_state.est_items,
-            filename=pdf_path,
-            notes="",
-            totals={
-                "items_total": grand_total,
-                "hamali_total": final_hamali_total,
-                "auto_charge": st.session_state.auto_charge,
-                "discount": st.session_state.discount,
-                "grand_total": final_total
             }
+
+        estimate_id, estimate_no = save_estimate(
+            header,
+            st.session_state.est_items,
+            customer=new_customer
         )
 
-        # 3️⃣ Save estimate to DB
-        customer_id = get_customer_id(customer_name)
+        # 2️⃣ Queue the PDF - rendered in the background from the saved rows
+        submit_render(estimate_id)
 
+        st.session_state.last_saved_estimate_id = estimate_id
+        st.session_state.pop("last_saved_pdf", None)
+        st.success(f"Estimate {estimate_no} saved")
+
+        # Exit edit mode
         if is_editing:
-            estimate_id = st.session_state.edit_estimate_id
-
-            update_estimate_header(
-                estimate_id=estimate_id,
-                date=est_date,
-                customer_id=customer_id,
-                items_total=grand_total,
-                hamali_total=final_hamali_total,
-                auto_charge=st.session_state.auto_charge,
-                discount=st.session_state.discount,
-                grand_total=final_total,
-                pdf_path=pdf_path
-            )
+            del st.session_state.edit_estimate_id
 
-            delete_estimate_items(estimate_id)
+    # 3️⃣ Open PDF once the background render has finished - the status
+    # is polled only while it renders, the finished PDF is kept in the
+    # session until it is downloaded or a new estimate is started
+    if "last_saved_estimate_id" in st.session_state and "last_saved_pdf" not in st.session_state:
+        estimate_id = st.session_state.last_saved_estimate_id
+        pdf = get_pdf_status(estimate_id)
 
-        else:
-            estimate_id = save_estimate_header(
-                estimate_no=st.session_state.current_est_no,
-                date=est_date,
-                customer_id=customer_id,
-                items_total=grand_total,
-                hamali_total=final_hamali_total,
-                auto_charge=st.session_state.auto_charge,
-                discount=st.session_state.discount,
-                grand_total=final_total,
-                pdf_path=pdf_path
-            )
+        if pdf is None:
+            _clear_saved_pdf()
 
-        save_estimate_items(
-            estimate_id=estimate_id,
-            items=st.session_state.est_items
-        )
+        elif pdf["pdf_status"] == "rendering":
+            st.info(f"⏳ Rendering PDF for {pdf['estimate_no']}…")
+            st.button("🔄 Refresh", key="refresh_estimate_pdf")
 
-        st.success("Estimate saved and PDF generated")
+        else:
+            if pdf["pdf_status"] != "failed":
+                # Served from the PDF cache the render just filled
+                pdf["data"] = get_estimate_pdf(estimate_id)
+            st.session_state.last_saved_pdf = pdf
 
-        # Exit edit mode
-        if is_editing:
-            del st.session_state.edit_estimate_id
+    pdf = st.session_state.get("last_saved_pdf")
+    if pdf is not None:
+        p1, p2 = st.columns([3, 1])
+
+        if pdf["pdf_status"] == "failed":
+            p1.error(f"PDF for {pdf['estimate_no']} failed: {pdf['pdf_error']}")
         else:
-            st.session_state.current_est_no = get_next_estimate_no()
-
-        # 4️⃣ Open PDF
-        if os.path.exists(pdf_path):
-            with open(pdf_path, "rb") as f:
-                st.download_button(
-                    "🖨 Open / Print PDF",
-                    f,
-                    file_name=os.path.basename(pdf_path),
-                    mime="application/pdf",
-                    key="print_estimate_pdf"
-                )
+            p1.download_button(
+                "🖨 Open / Print PDF",
+                pdf["data"],
+                file_name=os.path.basename(pdf["pdf_path"]),
+                mime="application/pdf",
+                key="print_estimate_pdf",
+                on_click=_clear_saved_pdf
+            )
 
-    
+        p2.button("🆕 New Estimate", key="new_estimate_btn", on_click=_start_new_estimate)
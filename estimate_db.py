@@ -1,24 +1,71 @@
-import sqlite3 
-from db.connection import get_connection
+import datetime
+import re
+import threading
+
+from db.connection import get_connection, transaction
+from db.customer_db import resolve_or_create_customer
+
+BILLS_DIR = "bills"
+
+
+def estimate_pdf_path(estimate_no):
+    return f"{BILLS_DIR}/{estimate_no}.pdf"
+
+
+def _format_estimate_no(row):
+    return f"{row['prefix']}{row['value']:0{row['width']}d}"
+
 
 def get_next_estimate_no():
+    """
+    Preview the number the next saved estimate will most likely get.
+
+    Only a hint for display - the real number is handed out by
+    allocate_estimate_no() when the estimate is saved.
+    """
     conn = get_connection()
     row = conn.execute(
         """
-        SELECT estimate_no
-        FROM estimates
-        ORDER BY id DESC
-        LIMIT 1
+        SELECT prefix, width, next_value AS value
+        FROM number_sequences
+        WHERE name = 'estimate'
         """
     ).fetchone()
-    conn.close()
 
-    if not row:
-        return "SRS001"
+    return _format_estimate_no(row)
+
+
+def allocate_estimate_no():
+    """
+    Atomically take the next estimate number from the sequence table.
+
+    Runs as a write transaction (or joins the caller's), so concurrent
+    sessions never receive the same number.
+    """
+    with transaction() as conn:
+        row = conn.execute(
+            """
+            UPDATE number_sequences
+            SET next_value = next_value + 1
+            WHERE name = 'estimate'
+            RETURNING prefix, width, next_value - 1 AS value
+            """
+        ).fetchone()
+
+    return _format_estimate_no(row)
 
-    last_no = row["estimate_no"]  # e.g. SRS007
-    num = int(last_no.replace("SRS", ""))
-    return f"SRS{num + 1:03d}"
+
+def set_estimate_number_format(prefix=None, width=None):
+    with transaction() as conn:
+        conn.execute(
+            """
+            UPDATE number_sequences SET
+                prefix = COALESCE(?, prefix),
+                width = COALESCE(?, width)
+            WHERE name = 'estimate'
+            """,
+            (prefix, width)
+        )
 
 
 def save_estimate_header(
@@ -32,54 +79,70 @@ def save_estimate_header(
     grand_total,
     pdf_path
 ):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO estimates (
-            estimate_no,
-            date,
-            customer_id,
-            items_total,
-            hamali_total,
-            auto_charge,
-            discount,
-            grand_total,
-            pdf_path,
-            status
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-        """,
-        (
-            estimate_no,
-            date,
-            customer_id,
-            items_total,
-            hamali_total,
-            auto_charge,
-            discount,
-            grand_total,
-            pdf_path
+    with transaction() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO estimates (
+                estimate_no,
+                date,
+                customer_id,
+                items_total,
+                hamali_total,
+                auto_charge,
+                discount,
+                grand_total,
+                pdf_path,
+                status
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+            """,
+            (
+                estimate_no,
+                date,
+                customer_id,
+                items_total,
+                hamali_total,
+                auto_charge,
+                discount,
+                grand_total,
+                pdf_path
+            )
         )
-    )
 
-    estimate_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return estimate_id
+    return cur.lastrowid
 
 
-def save_estimate_items(estimate_id, items):
-    conn = get_connection()
-    cur = conn.cursor()
-
+def _estimate_item_rows(estimate_id, items):
     for item in items:
         qty = item.get("qty", 0)
         rate = item.get("rate", 0.0)
         hamali_rate = item.get("hamali_rate", 0.0)
 
-        cur.execute(
+        yield (
+            estimate_id,
+            item.get("item_name", ""),
+            item.get("desc", ""),
+            qty,
+            item.get("unit", ""),
+            rate,
+            qty * rate,
+            hamali_rate,
+            qty * hamali_rate
+        )
+
+
+def _reindex_estimate_search(conn, estimate_id):
+    # Once per estimate after its lines change (no per-line triggers)
+    conn.execute("DELETE FROM estimate_search WHERE rowid = ?", (estimate_id,))
+    conn.execute("""
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = ?
+    """, (estimate_id,))
+
+
+def save_estimate_items(estimate_id, items):
+    with transaction() as conn:
+        conn.executemany(
             """
             INSERT INTO estimate_items (
                 estimate_id,
@@ -94,21 +157,9 @@ def save_estimate_items(estimate_id, items):
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                estimate_id,
-                item.get("item_name", ""),
-                item.get("desc", ""),
-                qty,
-                item.get("unit", ""),
-                rate,
-                qty * rate,
-                hamali_rate,
-                qty * hamali_rate
-            )
+            _estimate_item_rows(estimate_id, items)
         )
-
-    conn.commit()
-    conn.close()
+        _reindex_estimate_search(conn, estimate_id)
 
 def update_estimate_header(
     estimate_id,
@@ -121,87 +172,172 @@ def update_estimate_header(
     grand_total,
     pdf_path
 ):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        UPDATE estimates SET
-            date = ?,
-            customer_id = ?,
-            items_total = ?,
-            hamali_total = ?,
-            auto_charge = ?,
-            discount = ?,
-            grand_total = ?,
-            pdf_path = ?
-        WHERE id = ?
-    """, (
-        date,
-        customer_id,
-        items_total,
-        hamali_total,
-        auto_charge,
-        discount,
-        grand_total,
-        pdf_path,
-        estimate_id
-    ))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE estimates SET
+                date = ?,
+                customer_id = ?,
+                items_total = ?,
+                hamali_total = ?,
+                auto_charge = ?,
+                discount = ?,
+                grand_total = ?,
+                pdf_path = ?
+            WHERE id = ?
+        """, (
+            date,
+            customer_id,
+            items_total,
+            hamali_total,
+            auto_charge,
+            discount,
+            grand_total,
+            pdf_path,
+            estimate_id
+        ))
 
 def delete_estimate_items(estimate_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM estimate_items WHERE estimate_id = ?", (estimate_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM estimate_items WHERE estimate_id = ?", (estimate_id,))
+        _reindex_estimate_search(conn, estimate_id)
+
+def save_estimate(header, items, customer=None):
+    """
+    Save an estimate header and all of its line items as one unit of work.
+
+    `header` holds the save_estimate_header() fields; when it also has an
+    "id" the existing estimate is updated and its items replaced. A new
+    estimate without an "estimate_no" gets one from the sequence inside
+    the same transaction, and a missing "pdf_path" defaults to the bills
+    folder. Passing `customer` (name / phone / address) resolves or
+    creates the customer in the same transaction and sets customer_id.
+    Either everything is written with a single commit or nothing is.
+    Returns (estimate_id, estimate_no).
+    """
+    fields = dict(header)
+    estimate_id = fields.pop("id", None)
+
+    with transaction():
+        if customer is not None:
+            fields["customer_id"] = resolve_or_create_customer(**customer)
+
+        if estimate_id:
+            estimate_no = fields.pop("estimate_no")
+            fields.setdefault("pdf_path", estimate_pdf_path(estimate_no))
+
+            update_estimate_header(estimate_id=estimate_id, **fields)
+            delete_estimate_items(estimate_id)
+        else:
+            if not fields.get("estimate_no"):
+                fields["estimate_no"] = allocate_estimate_no()
+            estimate_no = fields["estimate_no"]
+            fields.setdefault("pdf_path", estimate_pdf_path(estimate_no))
+
+            estimate_id = save_estimate_header(**fields)
+
+        save_estimate_items(estimate_id, items)
+
+    return estimate_id, estimate_no
 
 def get_estimate_summary():
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-
     total = conn.execute("""
-        SELECT
-            COUNT(*) AS count,
-            COALESCE(SUM(grand_total), 0) AS amount
-        FROM estimates
+        SELECT count, amount
+        FROM estimate_counters
+        WHERE name = 'all'
     """).fetchone()
 
     today = conn.execute("""
-        SELECT
-            COUNT(*) AS count,
-            COALESCE(SUM(grand_total), 0) AS amount
-        FROM estimates
+        SELECT count, amount
+        FROM estimate_daily_totals
         WHERE date = DATE('now')
     """).fetchone()
 
-    conn.close()
-
     return {
-        "total_count": total["count"],
-        "total_amount": total["amount"],
-        "today_count": today["count"],
-        "today_amount": today["amount"]
+        "total_count": total["count"] if total else 0,
+        "total_amount": total["amount"] if total else 0,
+        "today_count": today["count"] if today else 0,
+        "today_amount": today["amount"] if today else 0
     }
 
+
+def rebuild_estimate_totals():
+    """Recompute the trigger-maintained rollup tables from estimates."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM estimate_daily_totals")
+        conn.execute("""
+            INSERT INTO estimate_daily_totals (date, count, amount)
+            SELECT date, COUNT(*), COALESCE(SUM(grand_total), 0)
+            FROM estimates
+            GROUP BY date
+        """)
+
+        conn.execute("""
+            INSERT OR REPLACE INTO estimate_counters (name, count, amount)
+            SELECT 'all', COUNT(*), COALESCE(SUM(grand_total), 0)
+            FROM estimates
+        """)
+
 def estimate_exists(estimate_no):
     conn = get_connection()
     row = conn.execute(
         "SELECT 1 FROM estimates WHERE estimate_no = ?",
         (estimate_no,)
     ).fetchone()
-    conn.close()
     return row is not None
 
-def get_filtered_estimates(
+def _estimate_filters(
     estimate_no=None,
     customer_name=None,
     start_date=None,
     end_date=None
 ):
+    clauses = []
+    params = []
+
+    if estimate_no:
+        clauses.append("e.estimate_no LIKE ?")
+        params.append(f"%{estimate_no}%")
+
+    if customer_name:
+        clauses.append("e.customer_id = (SELECT id FROM customers WHERE name = ?)")
+        params.append(customer_name)
+
+    if start_date:
+        clauses.append("e.date >= ?")
+        params.append(start_date)
+
+    if end_date:
+        clauses.append("e.date <= ?")
+        params.append(end_date)
+
+    return clauses, params
+
+
+def get_filtered_estimates(
+    estimate_no=None,
+    customer_name=None,
+    start_date=None,
+    end_date=None,
+    limit=None,
+    before_id=None
+):
+    """
+    Estimates matching the filters, newest first.
+
+    Pass `limit` for a page and the last id of the previous page as
+    `before_id` for the next one (keyset pagination on e.id).
+    """
     conn = get_connection()
 
+    clauses, params = _estimate_filters(
+        estimate_no, customer_name, start_date, end_date
+    )
+
+    if before_id is not None:
+        clauses.append("e.id < ?")
+        params.append(before_id)
+
     query = """
         SELECT 
             e.id,
@@ -209,39 +345,131 @@ def get_filtered_estimates(
             e.date,
             c.name AS customer_name,
             e.grand_total,
-            e.pdf_path
+            e.pdf_path,
+            e.pdf_status
         FROM estimates e
         LEFT JOIN customers c ON e.customer_id = c.id
-        WHERE 1=1
     """
-    params = []
 
-    if estimate_no:
-        query += " AND e.estimate_no LIKE ?"
-        params.append(f"%{estimate_no}%")
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
 
-    if customer_name:
-        query += " AND c.name = ?"
-        params.append(customer_name)
+    query += " ORDER BY e.id DESC"
 
-    if start_date:
-        query += " AND e.date >= ?"
-        params.append(start_date)
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
 
-    if end_date:
-        query += " AND e.date <= ?"
-        params.append(end_date)
+    rows = conn.execute(query, params).fetchall()
+    return rows
 
-    query += " ORDER BY e.id DESC"
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
 
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
+
+def search_estimates(
+    query,
+    limit=50,
+    customer_name=None,
+    start_date=None,
+    end_date=None
+):
+    """
+    Full-text search over estimate no, customer name / phone / address and
+    line item names / descriptions. Newest matches first.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+
+    conn = get_connection()
+
+    clauses, params = _estimate_filters(
+        customer_name=customer_name,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+    matches = "SELECT rowid FROM estimate_search WHERE estimate_search MATCH ?"
+    search_params = [match]
+
+    # unicode61 indexes "SRS007" as one token, so part of a number
+    # ("007") is matched through the trigram index on estimate_no
+    term = query.strip()
+    if len(term) >= 3 and re.fullmatch(r"\w*\d\w*", term):
+        matches += " UNION SELECT rowid FROM estimate_no_search WHERE estimate_no_search MATCH ?"
+        search_params.append('"' + term + '"')
+
+    search = f"e.id IN ({matches})"
+
+    sql = f"""
+        SELECT
+            e.id,
+            e.estimate_no,
+            e.date,
+            c.name AS customer_name,
+            e.grand_total,
+            e.pdf_path,
+            e.pdf_status
+        FROM estimates e
+        LEFT JOIN customers c ON e.customer_id = c.id
+        WHERE {search}
+    """
+
+    for clause in clauses:
+        sql += f" AND {clause}"
+
+    sql += " ORDER BY e.id DESC LIMIT ?"
+
+    rows = conn.execute(sql, [*search_params, *params, limit]).fetchall()
     return rows
 
-def get_estimate_by_id(estimate_id):
+def count_filtered_estimates(
+    estimate_no=None,
+    customer_name=None,
+    start_date=None,
+    end_date=None
+):
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
+    clauses, params = _estimate_filters(
+        estimate_no, customer_name, start_date, end_date
+    )
+
+    if not clauses:
+        row = conn.execute(
+            "SELECT count FROM estimate_counters WHERE name = 'all'"
+        ).fetchone()
+        return row["count"] if row else 0
+
+    row = conn.execute(
+        "SELECT COUNT(*) FROM estimates e WHERE " + " AND ".join(clauses),
+        params
+    ).fetchone()
+    return row[0]
+
+def get_estimate_ids(start_date=None, end_date=None, estimate_nos=None):
+    """Ids of the estimates in a date range and / or with the given numbers, oldest first."""
+    conn = get_connection()
+
+    clauses, params = _estimate_filters(start_date=start_date, end_date=end_date)
+
+    if estimate_nos:
+        placeholders = ", ".join("?" for _ in estimate_nos)
+        clauses.append(f"e.estimate_no IN ({placeholders})")
+        params.extend(estimate_nos)
+
+    query = "SELECT e.id FROM estimates e"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY e.id"
+
+    return [row["id"] for row in conn.execute(query, params)]
+
+def get_estimate_by_id(estimate_id):
+    conn = get_connection()
     header = conn.execute(
         """
         SELECT e.*, c.name AS customer_name, c.phone, c.address
@@ -261,69 +489,244 @@ def get_estimate_by_id(estimate_id):
         (estimate_id,)
     ).fetchall()
 
-    conn.close()
-
     return dict(header), [dict(item) for item in items]
 
 
-def delete_estimate(estimate_id):
+def iter_customer_statement(customer_id, start_date=None, end_date=None, batch_size=500):
+    """
+    Yield one row per estimate line for a customer's statement, oldest
+    estimate first (estimates without lines yield one row with NULL
+    item columns). Single query, read in fetchmany() batches.
+    """
     conn = get_connection()
-    conn.execute("DELETE FROM estimate_items WHERE estimate_id = ?", (estimate_id,))
-    conn.execute("DELETE FROM estimates WHERE id = ?", (estimate_id,))
-    conn.commit()
-    conn.close()
 
-def get_all_estimates():
-    conn = get_connection()
-    rows = conn.execute(
-        """
-        SELECT 
+    clauses, params = _estimate_filters(start_date=start_date, end_date=end_date)
+    clauses.insert(0, "e.customer_id = ?")
+    params.insert(0, customer_id)
+
+    cur = conn.execute(f"""
+        SELECT
             e.id,
             e.estimate_no,
             e.date,
-            c.name AS customer_name,
+            e.items_total,
+            e.hamali_total,
+            e.auto_charge,
+            e.discount,
             e.grand_total,
-            e.pdf_path
+            i.item_name,
+            i.description,
+            i.qty,
+            i.unit,
+            i.rate,
+            i.row_total
         FROM estimates e
-        LEFT JOIN customers c ON e.customer_id = c.id
-        ORDER BY e.id DESC
+        LEFT JOIN estimate_items i ON i.estimate_id = e.id
+        WHERE {" AND ".join(clauses)}
+        ORDER BY e.date, e.id, i.id
+    """, params)
+
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+ESTIMATE_EXPORT_COLUMNS = {
+    "estimate": [
+        "Estimate No", "Date", "Customer", "Phone", "Lines",
+        "Items Total", "Hamali Total", "Auto Charge", "Discount", "Grand Total"
+    ],
+    "line": [
+        "Estimate No", "Date", "Customer", "Phone", "Item", "Description",
+        "Qty", "Unit", "Rate", "Amount", "Hamali Rate", "Hamali Total"
+    ]
+}
+
+
+def iter_estimate_export(start_date=None, end_date=None, granularity="estimate", batch_size=500):
+    """
+    Yield export rows for the estimates in a date range, oldest first, in
+    the order of ESTIMATE_EXPORT_COLUMNS[granularity]: one row per
+    estimate ("estimate") or one per estimate line ("line"). Single
+    query, read in fetchmany() batches.
+    """
+    conn = get_connection()
+
+    clauses, params = _estimate_filters(start_date=start_date, end_date=end_date)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    if granularity == "line":
+        query = f"""
+            SELECT
+                e.estimate_no,
+                e.date,
+                c.name,
+                c.phone,
+                i.item_name,
+                i.description,
+                i.qty,
+                i.unit,
+                i.rate,
+                i.row_total,
+                i.hamali_rate,
+                i.hamali_total
+            FROM estimates e
+            JOIN estimate_items i ON i.estimate_id = e.id
+            LEFT JOIN customers c ON e.customer_id = c.id
+            {where}
+            ORDER BY e.date, e.id, i.id
+        """
+    else:
+        query = f"""
+            SELECT
+                e.estimate_no,
+                e.date,
+                c.name,
+                c.phone,
+                (SELECT COUNT(*) FROM estimate_items i WHERE i.estimate_id = e.id),
+                e.items_total,
+                e.hamali_total,
+                e.auto_charge,
+                e.discount,
+                e.grand_total
+            FROM estimates e
+            LEFT JOIN customers c ON e.customer_id = c.id
+            {where}
+            ORDER BY e.date, e.id
         """
-    ).fetchall()
-    conn.close()
-    return rows
 
-def get_monthly_estimate_summary(year, month):
+    cur = conn.execute(query, params)
+
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+def set_pdf_status(estimate_id, status, render_ms=None, error=None):
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE estimates SET
+                pdf_status = ?,
+                pdf_render_ms = ?,
+                pdf_error = ?
+            WHERE id = ?
+        """, (status, render_ms, error, estimate_id))
+
+
+def clear_pdf_status(status, estimate_id=None):
+    """Reset pdf_status from `status` to NULL, for one estimate or all; returns the rows changed."""
+    clauses, params = ["pdf_status = ?"], [status]
+    if estimate_id is not None:
+        clauses.append("id = ?")
+        params.append(estimate_id)
+
+    with transaction() as conn:
+        cur = conn.execute(f"""
+            UPDATE estimates SET
+                pdf_status = NULL,
+                pdf_error = NULL
+            WHERE {" AND ".join(clauses)}
+        """, params)
+
+    return cur.rowcount
+
+
+def get_pdf_status(estimate_id):
+    conn = get_connection()
+    row = conn.execute("""
+        SELECT estimate_no, pdf_path, pdf_status, pdf_render_ms, pdf_error
+        FROM estimates
+        WHERE id = ?
+    """, (estimate_id,)).fetchone()
+
+    return dict(row) if row else None
+
+
+def delete_estimate(estimate_id):
+    with transaction() as conn:
+        conn.execute("DELETE FROM estimate_items WHERE estimate_id = ?", (estimate_id,))
+        conn.execute("DELETE FROM estimates WHERE id = ?", (estimate_id,))
+
+def get_all_estimates(limit=None, before_id=None):
+    return get_filtered_estimates(limit=limit, before_id=before_id)
+
+def _month_range(year, month):
+    """Half-open [first day, first day of next month) as ISO date strings."""
+    start = datetime.date(year, month, 1)
+    if month == 12:
+        end = datetime.date(year + 1, 1, 1)
+    else:
+        end = datetime.date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+# ---------------- MONTHLY REPORT CACHE ----------------
+# Process-wide monthly report results keyed on (report, year, month) for
+# the current 'estimate_totals' data version, which triggers bump on every
+# change to estimate_daily_totals. Flipping back to a month already viewed
+# is served from memory; any estimate write drops every cached month.
+_reports_lock = threading.Lock()
+_reports = {"version": None, "results": {}}
+
+
+def _cached_report(report, year, month, load):
+    global _reports
+
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
+    version = conn.execute(
+        "SELECT version FROM data_versions WHERE name = 'estimate_totals'"
+    ).fetchone()["version"]
+    key = (report, year, month)
 
+    with _reports_lock:
+        if _reports["version"] != version:
+            _reports = {"version": version, "results": {}}
+        result = _reports["results"].get(key)
+
+    if result is None:
+        result = load(conn, year, month)
+        with _reports_lock:
+            if _reports["version"] == version:
+                _reports["results"][key] = result
+
+    return result
+
+
+def _load_monthly_summary(conn, year, month):
     summary = conn.execute("""
         SELECT
-            COUNT(*) AS count,
-            COALESCE(SUM(grand_total), 0) AS amount
-        FROM estimates
-        WHERE strftime('%Y', date) = ?
-          AND strftime('%m', date) = ?
-    """, (str(year), f"{month:02d}")).fetchone()
+            COALESCE(SUM(count), 0) AS count,
+            COALESCE(SUM(amount), 0) AS amount
+        FROM estimate_daily_totals
+        WHERE date >= ?
+          AND date < ?
+    """, _month_range(year, month)).fetchone()
 
-    conn.close()
     return dict(summary)
 
 
-def get_daywise_estimates(year, month):
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-
+def _load_daywise(conn, year, month):
     rows = conn.execute("""
         SELECT
             date,
-            COUNT(*) AS count,
-            SUM(grand_total) AS amount
-        FROM estimates
-        WHERE strftime('%Y', date) = ?
-          AND strftime('%m', date) = ?
-        GROUP BY date
+            count,
+            amount
+        FROM estimate_daily_totals
+        WHERE date >= ?
+          AND date < ?
         ORDER BY date
-    """, (str(year), f"{month:02d}")).fetchall()
+    """, _month_range(year, month)).fetchall()
+
+    return [dict(row) for row in rows]
 
-    conn.close()
-    return [dict(row) for row in rows]
\ No newline at end of file
+
+def get_monthly_estimate_summary(year, month):
+    return dict(_cached_report("summary", year, month, _load_monthly_summary))
+
+
+def get_daywise_estimates(year, month):
+    return [dict(row) for row in _cached_report("daywise", year, month, _load_daywise)]
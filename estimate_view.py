@@ -1,11 +1,23 @@
 import streamlit as st
-import os
+import math
 from datetime import date
 from db.estimate_db import (
     get_filtered_estimates,
-    delete_estimate
+    count_filtered_estimates,
+    search_estimates,
+    delete_estimate,
+    get_pdf_status,
+    clear_pdf_status,
+    iter_customer_statement,
+    iter_estimate_export,
+    ESTIMATE_EXPORT_COLUMNS
 )
-from db.customer_db import get_customer_names
+from utilities.pdf_worker import get_estimate_pdf
+from utilities.pdf_generator_utils import generate_customer_statement_pdf
+from utilities.spreadsheet_utils import MIME_TYPES, write_rows
+from db.customer_db import get_customer_names, get_customer
+
+PAGE_SIZE = 50
 
 
 def show():
@@ -16,9 +28,10 @@ def show():
         f1, f2, f3, f4 = st.columns([2, 3, 2, 2])
 
         with f1:
-            search_est = st.text_input(
-                "Estimate No",
-                placeholder="SRS001"
+            search = st.text_input(
+                "Search",
+                placeholder="SRS001, customer, phone, item",
+                help="Matches estimate no, customer name / phone / address and item names"
             )
 
         with f2:
@@ -40,20 +53,169 @@ def show():
                 value=None
             )
 
+    # ---------------- CUSTOMER STATEMENT ----------------
+    with st.expander("🧾 Customer Statement"):
+        s1, s2, s3 = st.columns([3, 2, 2])
+
+        statement_customer = s1.selectbox(
+            "Customer",
+            customers[1:],
+            key="statement_customer"
+        )
+        statement_start = s2.date_input(
+            "From",
+            value=date.today().replace(day=1),
+            key="statement_start"
+        )
+        statement_end = s3.date_input(
+            "To",
+            value=date.today(),
+            key="statement_end"
+        )
+
+        if st.button("📄 Generate Statement", key="statement_btn", disabled=not statement_customer):
+            customer = get_customer(statement_customer)
+
+            # Lines are streamed from the database straight into the PDF
+            statement_pdf = generate_customer_statement_pdf(
+                customer,
+                iter_customer_statement(customer["id"], statement_start, statement_end),
+                start_date=statement_start,
+                end_date=statement_end
+            )
+
+            st.download_button(
+                "🖨 Open / Print Statement",
+                statement_pdf,
+                file_name=f"Statement_{statement_customer}_{statement_start}_{statement_end}.pdf",
+                mime="application/pdf",
+                key="statement_download"
+            )
+
+    # ---------------- EXPORT ----------------
+    with st.expander("📤 Export Estimates"):
+        x1, x2, x3, x4 = st.columns([2, 2, 3, 2])
+
+        export_start = x1.date_input(
+            "From",
+            value=date.today().replace(month=1, day=1),
+            key="export_start"
+        )
+        export_end = x2.date_input(
+            "To",
+            value=date.today(),
+            key="export_end"
+        )
+        export_granularity = x3.radio(
+            "Rows",
+            ["estimate", "line"],
+            format_func=lambda g: "One per estimate" if g == "estimate" else "One per item line",
+            horizontal=True,
+            key="export_granularity"
+        )
+        export_format = x4.radio(
+            "Format",
+            ["xlsx", "csv"],
+            format_func=lambda f: "Excel (.xlsx)" if f == "xlsx" else "CSV",
+            horizontal=True,
+            key="export_format"
+        )
+
+        if st.button("📤 Export", key="export_btn"):
+            # Rows are streamed from the database straight into the file
+            data = write_rows(
+                iter_estimate_export(export_start, export_end, export_granularity),
+                ESTIMATE_EXPORT_COLUMNS[export_granularity],
+                export_format,
+                sheet_name="Estimates"
+            )
+
+            st.download_button(
+                "📤 Download Export",
+                data,
+                file_name=f"Estimates_{export_start}_{export_end}.{export_format}",
+                mime=MIME_TYPES[export_format],
+                key="export_download"
+            )
+
     customer_filter = None if selected_customer == "All" else selected_customer
 
+    filters = {
+        "customer_name": customer_filter,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+
+    searching = bool(search.strip())
+
     # ---------------- FETCH DATA ----------------
-    estimates = get_filtered_estimates(
-        estimate_no=search_est or None,
-        customer_name=customer_filter,
-        start_date=start_date,
-        end_date=end_date
-    )
+    if searching:
+        # Full-text matches, newest first (first PAGE_SIZE only)
+        estimates = search_estimates(search, limit=PAGE_SIZE, **filters)
+    else:
+        # ---- Page cursors (last id of each previous page), reset on filter change ----
+        if st.session_state.get("est_view_filters") != filters:
+            st.session_state.est_view_filters = filters
+            st.session_state.est_page_cursors = [None]
+
+        cursors = st.session_state.est_page_cursors
+
+        total = count_filtered_estimates(**filters)
+
+        estimates = get_filtered_estimates(
+            **filters,
+            limit=PAGE_SIZE + 1,
+            before_id=cursors[-1]
+        )
+
+        # A later page emptied by deletes: step back instead of stranding
+        # the user on "No estimates found" with no Prev button
+        if not estimates and len(cursors) > 1:
+            cursors.pop()
+            st.rerun()
+
+        has_next = len(estimates) > PAGE_SIZE
+        estimates = estimates[:PAGE_SIZE]
 
     if not estimates:
         st.info("No estimates found for the selected filters.")
         return
 
+    # ---------------- PRINT SELECTED ESTIMATE ----------------
+    if "print_estimate_id" in st.session_state:
+        pdf = get_pdf_status(st.session_state.print_estimate_id)
+
+        if pdf is None:
+            del st.session_state.print_estimate_id
+        else:
+            st.subheader(f"🖨 Estimate {pdf['estimate_no']}")
+            d1, d2 = st.columns([3, 1])
+
+            try:
+                # From the PDF cache, rendered only if it is not there yet
+                data = get_estimate_pdf(st.session_state.print_estimate_id)
+            except Exception as e:
+                d1.error(f"Could not generate the PDF: {e}")
+            else:
+                d1.download_button(
+                    "🖨 Open / Print PDF",
+                    data,
+                    file_name=f"{pdf['estimate_no']}.pdf",
+                    mime="application/pdf",
+                    key="print_selected_estimate"
+                )
+
+                # The render works now - drop the ⚠️ left by a failed one
+                if pdf["pdf_status"] == "failed":
+                    clear_pdf_status("failed", st.session_state.print_estimate_id)
+                    st.rerun()
+
+            if d2.button("Close", key="close_print_estimate"):
+                del st.session_state.print_estimate_id
+                st.rerun()
+
+            st.divider()
+
     # ---------------- TABLE HEADER ----------------
     h1, h2, h3, h4, h5 = st.columns([2, 2, 3, 2, 3])
     h1.markdown("**Estimate No**")
@@ -75,18 +237,12 @@ def show():
 
         a1, a2, a3 = c5.columns(3)
 
-        # 🖨 Reprint PDF
-        if est["pdf_path"] and os.path.exists(est["pdf_path"]):
-            with open(est["pdf_path"], "rb") as f:
-                a1.download_button(
-                    "🖨",
-                    f,
-                    file_name=os.path.basename(est["pdf_path"]),
-                    mime="application/pdf",
-                    key=f"print_{est['id']}"
-                )
-        else:
-            a1.write("—")
+        # 🖨 Reprint PDF - only the selected estimate's PDF is loaded
+        if est["pdf_status"] == "rendering":
+            a1.write("⏳")
+        elif a1.button("🖨" if est["pdf_status"] != "failed" else "⚠️", key=f"print_{est['id']}"):
+            st.session_state.print_estimate_id = est["id"]
+            st.rerun()
 
         # ✏️ Edit
         if a2.button("✏️", key=f"edit_{est['id']}"):
@@ -98,6 +254,28 @@ def show():
         if a3.button("❌", key=f"del_{est['id']}"):
             st.session_state.delete_estimate_id = est["id"]
 
+    # ---------------- PAGINATION ----------------
+    st.divider()
+
+    if searching:
+        if len(estimates) == PAGE_SIZE:
+            st.caption(f"Showing the {PAGE_SIZE} most recent matches - refine the search to narrow it down.")
+    else:
+        p1, p2, p3 = st.columns([1, 3, 1])
+
+        if p1.button("◀ Prev", key="est_page_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+
+        p2.write(
+            f"Page {len(cursors)} of {max(1, math.ceil(total / PAGE_SIZE))} "
+            f"({total} estimates)"
+        )
+
+        if p3.button("Next ▶", key="est_page_next", disabled=not has_next):
+            cursors.append(estimates[-1]["id"])
+            st.rerun()
+
     # ---------------- DELETE CONFIRMATION ----------------
     if "delete_estimate_id" in st.session_state:
         st.warning("Are you sure you want to delete this estimate?")
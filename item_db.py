@@ -1,40 +1,105 @@
-import sqlite3
-from db.connection import get_connection
+import threading
+from itertools import islice
+
+from db.connection import get_connection, transaction
+
+
+# ---------------- ITEM CATALOG CACHE ----------------
+# Process-wide copy of the items table shared by every session. Triggers
+# bump the 'items' row of data_versions on every insert/update/delete
+# (add_item, update_item, delete_item or another process), and the cache
+# reloads only when that version moves. Cached records are shared - copy
+# before modifying.
+_catalog_lock = threading.Lock()
+_catalog = {"version": None, "by_name": {}, "names": []}
+
+
+def _items_version(conn):
+    row = conn.execute(
+        "SELECT version FROM data_versions WHERE name = 'items'"
+    ).fetchone()
+    return row["version"]
+
+
+def get_item_catalog():
+    """Return {"version", "by_name", "names"} for the current item catalog."""
+    global _catalog
+
+    conn = get_connection()
+    version = _items_version(conn)
+
+    catalog = _catalog
+    if catalog["version"] == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog["version"] != version:
+            rows = conn.execute("""
+                SELECT id, name, description, unit, rate, hamali_rate
+                FROM items
+                ORDER BY name
+            """).fetchall()
+
+            by_name = {row["name"]: dict(row) for row in rows}
+            _catalog = {
+                "version": version,
+                "by_name": by_name,
+                "names": list(by_name)
+            }
+
+        return _catalog
 
 
 # ---------------- ADD ITEM ----------------
 def add_item(name, description, unit, rate, hamali_rate):
-    conn = get_connection()
-    cur = conn.cursor()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO items (name, description, unit, rate, hamali_rate)
+            VALUES (?, ?, ?, ?, ?)
+        """, (name, description, unit, rate, hamali_rate))
 
-    cur.execute("""
-        INSERT INTO items (name, description, unit, rate, hamali_rate)
-        VALUES (?, ?, ?, ?, ?)
-    """, (name, description, unit, rate, hamali_rate))
 
-    conn.commit()
-    conn.close()
+# ---------------- ITEM EXISTS ----------------
+def item_exists(name, exclude_id=None):
+    """True if another item (not `exclude_id`, when editing) has this name."""
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT 1 FROM items WHERE name = ? AND id IS NOT ?",
+        (name, exclude_id)
+    ).fetchone()
+    return row is not None
 
 
 # ---------------- GET ALL ITEMS ----------------
 def get_all_items():
+    catalog = get_item_catalog()
+    return [dict(catalog["by_name"][name]) for name in catalog["names"]]
+
+
+# ---------------- ITER ITEMS (FOR EXPORT) ----------------
+def iter_items(batch_size=500):
+    """
+    Yield (name, description, unit, rate, hamali_rate) for every item,
+    ordered by name, read from the table in fetchmany() batches.
+    """
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
-    rows = conn.execute("""
-        SELECT id, name, description, unit, rate, hamali_rate
+    cur = conn.execute("""
+        SELECT name, description, unit, rate, hamali_rate
         FROM items
         ORDER BY name
-    """).fetchall()
+    """)
 
-    conn.close()
-    return [dict(row) for row in rows]
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
 
 
 # ---------------- GET ITEM BY ID ----------------
 def get_item_by_id(item_id):
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
     row = conn.execute("""
         SELECT id, name, description, unit, rate, hamali_rate
@@ -42,69 +107,135 @@ def get_item_by_id(item_id):
         WHERE id = ?
     """, (item_id,)).fetchone()
 
-    conn.close()
     return dict(row) if row else None
 
 # ---------------- GET ITEM NAMES (FOR COMBO BOX) ----------------
 def get_item_names():
-    conn = get_connection()
-    cur = conn.cursor()
-
-    rows = cur.execute(
-        "SELECT name FROM items ORDER BY name"
-    ).fetchall()
-
-    conn.close()
-    return [row[0] for row in rows]
+    return list(get_item_catalog()["names"])
 
 
 # ---------------- GET ITEM BY NAME (FOR AUTO-FILL) ----------------
 def get_item(item_name):
+    item = get_item_catalog()["by_name"].get(item_name)
+    if not item:
+        return None
+
+    return {
+        "name": item["name"],
+        "desc": item["description"],
+        "unit": item["unit"],
+        "price": item["rate"],
+        "hamali": item["hamali_rate"]
+    }
+
+# ---------------- GET ITEMS BY NAMES (BATCH, FOR THE ESTIMATE EDITOR) ----------------
+def get_items(names):
+    """
+    Look up several items at once, returning {name: record}.
+
+    Served from the catalog cache when it is current, otherwise with a
+    single WHERE name IN (...) query. Unknown names are left out.
+    """
+    names = list({name for name in names if name})
+    if not names:
+        return {}
+
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
 
-    row = conn.execute(
-        """
-        SELECT
-            name,
-            description AS desc,
-            unit,
-            rate AS price,
-            hamali_rate AS hamali
+    catalog = _catalog
+    if catalog["version"] == _items_version(conn):
+        by_name = catalog["by_name"]
+        return {name: by_name[name] for name in names if name in by_name}
+
+    placeholders = ", ".join("?" for _ in names)
+    rows = conn.execute(f"""
+        SELECT id, name, description, unit, rate, hamali_rate
         FROM items
-        WHERE name = ?
-        """,
-        (item_name,)
-    ).fetchone()
+        WHERE name IN ({placeholders})
+    """, names).fetchall()
 
-    conn.close()
-    return dict(row) if row else None
+    return {row["name"]: dict(row) for row in rows}
+
+# ---------------- BULK UPSERT (EXCEL IMPORT) ----------------
+IMPORT_CHUNK_SIZE = 500
+
+
+def _upsert_item_chunk(conn, chunk):
+    # Last row wins when a name repeats inside the chunk
+    rows = {row[0]: row for row in chunk}
+
+    placeholders = ", ".join("?" for _ in rows)
+    existing = {
+        row["name"]: tuple(row)
+        for row in conn.execute(f"""
+            SELECT name, description, unit, rate, hamali_rate
+            FROM items
+            WHERE name IN ({placeholders})
+        """, list(rows))
+    }
+
+    changed = [row for name, row in rows.items() if existing.get(name) != row]
+
+    conn.executemany("""
+        INSERT INTO items (name, description, unit, rate, hamali_rate)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (name) DO UPDATE SET
+            description = excluded.description,
+            unit = excluded.unit,
+            rate = excluded.rate,
+            hamali_rate = excluded.hamali_rate
+    """, changed)
+
+    inserted = sum(1 for row in changed if row[0] not in existing)
+    return inserted, len(changed) - inserted, len(rows) - len(changed)
+
+
+def upsert_items(rows, chunk_size=IMPORT_CHUNK_SIZE, summary=None):
+    """
+    Insert or update items from an iterable of
+    (name, description, unit, rate, hamali_rate) tuples.
+
+    Rows are consumed lazily and written in chunks, one transaction and
+    one executemany() per chunk; rows identical to the stored item are
+    skipped. Returns {"inserted", "updated", "unchanged"} counts; pass
+    `summary` to have them added as each chunk commits, so it still tells
+    what was saved if a later chunk (or reading the file) fails.
+    """
+    if summary is None:
+        summary = {}
+    for key in ("inserted", "updated", "unchanged"):
+        summary.setdefault(key, 0)
+
+    rows = iter(rows)
+    while True:
+        # Read the next chunk before taking the write lock
+        chunk = [tuple(row) for row in islice(rows, chunk_size)]
+        if not chunk:
+            break
+
+        with transaction() as conn:
+            counts = _upsert_item_chunk(conn, chunk)
+
+        for key, count in zip(summary, counts):
+            summary[key] += count
+
+    return summary
 
 # ---------------- UPDATE ITEM ----------------
 def update_item(item_id, name, description, unit, rate, hamali_rate):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        UPDATE items SET
-            name = ?,
-            description = ?,
-            unit = ?,
-            rate = ?,
-            hamali_rate = ?
-        WHERE id = ?
-    """, (name, description, unit, rate, hamali_rate, item_id))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE items SET
+                name = ?,
+                description = ?,
+                unit = ?,
+                rate = ?,
+                hamali_rate = ?
+            WHERE id = ?
+        """, (name, description, unit, rate, hamali_rate, item_id))
 
 
 # ---------------- DELETE ITEM ----------------
 def delete_item(item_id):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
-    conn.commit()
-    conn.close()
-
+    with transaction() as conn:
+        conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
@@ -1,8 +1,60 @@
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 
-from db.item_db import add_item , get_all_items , get_item_by_id, update_item, delete_item 
+from db.item_db import add_item , get_all_items , get_item_by_id, update_item, delete_item , item_exists, upsert_items, iter_items
+from utilities.spreadsheet_utils import MIME_TYPES, read_xlsx_records, write_rows
+
+ITEM_COLUMNS = ["Item Name", "Description", "Unit", "Rate", "Hamali Rate"]
+MAX_REJECTED_SHOWN = 100
+UNITS = ["pcs", "Kg", "Box", "Bag", "Dozen", "feet", "litre", "Meter"]
+UNITS_BY_KEY = {unit.casefold(): unit for unit in UNITS}
+
+
+def _to_rate(value):
+    if value is None or str(value).strip() == "":
+        return 0.0
+    rate = float(value)
+    if rate < 0:
+        raise ValueError
+    return rate
+
+
+def _valid_item_rows(records, rejected):
+    """
+    Yield (name, description, unit, rate, hamali_rate) tuples from
+    read_xlsx_records(). Bad rows are counted in rejected["count"] and the
+    first MAX_REJECTED_SHOWN kept in rejected["rows"] as (row, reason).
+    """
+    def reject(row_number, reason):
+        rejected["count"] += 1
+        if len(rejected["rows"]) < MAX_REJECTED_SHOWN:
+            rejected["rows"].append((row_number, reason))
+
+    for row_number, record in records:
+        name = str(record["Item Name"] or "").strip()
+        if not name:
+            reject(row_number, "Item Name is empty")
+            continue
+
+        unit = UNITS_BY_KEY.get(str(record["Unit"] or "").strip().casefold() or "pcs")
+        if unit is None:
+            reject(row_number, f"{name}: Unit must be one of {', '.join(UNITS)}")
+            continue
+
+        try:
+            rate = _to_rate(record["Rate"])
+            hamali_rate = _to_rate(record["Hamali Rate"])
+        except (TypeError, ValueError):
+            reject(row_number, f"{name}: Rate / Hamali Rate must be a number >= 0")
+            continue
+
+        yield (
+            name,
+            str(record["Description"] or "").strip(),
+            unit,
+            rate,
+            hamali_rate
+        )
+
 
 def show():
     st.header("Items")
@@ -30,11 +82,13 @@ def show():
                 value=item.get("name", "")
             )
 
-            unit_list = ["pcs", "Kg", "Box", "Bag", "Dozen", "feet", "litre", "Meter"]
+            # Items saved before units were checked may carry any unit
+            current_unit = item.get("unit") or "pcs"
+            unit_list = UNITS if current_unit in UNITS else UNITS + [current_unit]
             unit = st.selectbox(
                 "Unit",
                 unit_list,
-                index=unit_list.index(item.get("unit", "pcs"))
+                index=unit_list.index(current_unit)
             )
 
         with col2:
@@ -64,6 +118,10 @@ def show():
                 st.error("Item name is required")
                 return
 
+            if item_exists(name.strip(), exclude_id=st.session_state.get("edit_item_id")):
+                st.warning("Item already exists")
+                return
+
             if editing:
                 update_item(
                     item_id=st.session_state.edit_item_id,
@@ -96,6 +154,75 @@ def show():
         else:
             item = {}
 
+    # ---------- IMPORT / EXPORT ----------
+    with tab_ie:
+        col_imp, col_exp = st.columns(2)
+
+        # ---- IMPORT ----
+        with col_imp:
+            st.subheader("Import Items (Excel)")
+
+            uploaded_file = st.file_uploader(
+                "Upload Excel File",
+                type=["xlsx"]
+            )
+
+            if uploaded_file is not None and st.button("📥 Import Items"):
+                rejected = {"count": 0, "rows": []}
+                records = read_xlsx_records(uploaded_file, ITEM_COLUMNS)
+
+                summary = {}
+                try:
+                    with st.spinner("Importing items..."):
+                        upsert_items(_valid_item_rows(records, rejected), summary=summary)
+                except Exception as e:
+                    # Chunks commit as they go - say what is already saved
+                    st.error(f"Import stopped: {e}. Please use correct template.")
+                    st.warning(
+                        f"Saved before the error: {summary.get('inserted', 0)} added, "
+                        f"{summary.get('updated', 0)} updated, "
+                        f"{summary.get('unchanged', 0)} unchanged, "
+                        f"{rejected['count']} rejected"
+                    )
+                else:
+                    st.success(
+                        f"Import complete: {summary['inserted']} added, "
+                        f"{summary['updated']} updated, "
+                        f"{summary['unchanged']} unchanged, "
+                        f"{rejected['count']} rejected"
+                    )
+
+                if rejected["rows"]:
+                    st.warning(f"Rejected rows (first {MAX_REJECTED_SHOWN}):")
+                    st.table([
+                        {"Row": row_number, "Reason": reason}
+                        for row_number, reason in rejected["rows"]
+                    ])
+
+        # ---- EXPORT ----
+        with col_exp:
+            st.subheader("Export Items")
+
+            export_format = st.radio(
+                "Format",
+                ["xlsx", "csv"],
+                format_func=lambda f: "Excel (.xlsx)" if f == "xlsx" else "CSV",
+                horizontal=True,
+                key="item_export_format"
+            )
+
+            if st.button("📤 Export Items", key="item_export_btn"):
+                # Rows go straight from the items cursor into the file
+                data = write_rows(iter_items(), ITEM_COLUMNS, export_format, sheet_name="Items")
+
+                st.download_button(
+                    "📤 Download Items",
+                    data=data,
+                    file_name=f"items.{export_format}",
+                    mime=MIME_TYPES[export_format],
+                    key="item_export_download"
+                )
+
     # ---------- ITEM LIST ----------
     with tab_list:
         st.subheader("Item List")
@@ -170,73 +297,3 @@ def show():
 
             if col_no.button("Cancel", key="cancel_delete_item"):
                 del st.session_state.delete_item_id
-
-        
-
-    # ---------- IMPORT / EXPORT ----------
-    with tab_ie:
-        col_imp, col_exp = st.columns(2)
-
-        # ---- IMPORT ----
-        with col_imp:
-            st.subheader("Import Items (Excel)")
-
-            uploaded_file = st.file_uploader(
-                "Upload Excel File",
-                type=["xlsx"]
-            )
-
-            if uploaded_file is not None:
-                df = pd.read_excel(uploaded_file)
-
-                required_cols = [
-                    "Item Name",
-                    "Description",
-                    "Unit",
-                    "Rate",
-                    "Hamali Rate"
-                ]
-
-                if not all(col in df.columns for col in required_cols):
-                    st.error("Invalid Excel format. Please use correct template.")
-                else:
-                    st.success("Items imported (UI only for now)")
-                    st.dataframe(df, use_container_width=True)
-
-        # ---- EXPORT ----
-        with col_exp:
-            st.subheader("Export Items")
-
-            export_data = [
-                {
-                    "Item Name": "Cement",
-                    "Description": "UltraTech Cement 50kg",
-                    "Unit": "Bag",
-                    "Rate": 420,
-                    "Hamali Rate": 20
-                },
-                {
-                    "Item Name": "TMT Rod",
-                    "Description": "TMT Steel Rod",
-                    "Unit": "Kg",
-                    "Rate": 62,
-                    "Hamali Rate": 5
-                },
-            ]
-
-            export_df = pd.DataFrame(export_data)
-
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                export_df.to_excel(
-                    writer,
-                    index=False,
-                    sheet_name="Items"
-                )
-
-            st.download_button(
-                "📤 Download Items Excel",
-                data=output.getvalue(),
-                file_name="items.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
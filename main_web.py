@@ -9,10 +9,14 @@ from modules import (
     items , 
     monthly_report
 )
+from utilities.pdf_worker import start_worker
 
 
 st.set_page_config(page_title="Inv Web", layout="wide")
 
+# Background PDF renders (no-op after the first run in this process)
+start_worker()
+
 # ---------- Session State ----------
 if "page" not in st.session_state:
     st.session_state.page = "Dashboard"
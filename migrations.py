@@ -0,0 +1,587 @@
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------- SCHEMA MIGRATIONS ----------------
+# Each entry upgrades the schema by one version (PRAGMA user_version).
+# Entries are either a SQL script or a callable taking the connection.
+# Never edit an entry once released - append a new one instead.
+
+def _add_customer_keys(conn):
+    from db.customer_db import normalize_name, normalize_phone
+
+    conn.execute("ALTER TABLE customers ADD COLUMN name_key TEXT")
+    conn.execute("ALTER TABLE customers ADD COLUMN phone_key TEXT")
+
+    rows = conn.execute("SELECT id, name, phone FROM customers").fetchall()
+    conn.executemany(
+        "UPDATE customers SET name_key = ?, phone_key = ? WHERE id = ?",
+        [(normalize_name(row["name"]), normalize_phone(row["phone"]), row["id"]) for row in rows]
+    )
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_name_key ON customers (name_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_phone_key ON customers (phone_key)")
+
+
+MIGRATIONS = [
+    # 1 - base tables
+    """
+    CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        phone TEXT,
+        address TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        unit TEXT,
+        rate REAL DEFAULT 0,
+        hamali_rate REAL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS estimates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        estimate_no TEXT NOT NULL,
+        date TEXT NOT NULL,
+        customer_id INTEGER REFERENCES customers (id),
+        items_total REAL DEFAULT 0,
+        hamali_total REAL DEFAULT 0,
+        auto_charge REAL DEFAULT 0,
+        discount REAL DEFAULT 0,
+        grand_total REAL DEFAULT 0,
+        pdf_path TEXT,
+        status TEXT DEFAULT 'pending'
+    );
+
+    CREATE TABLE IF NOT EXISTS estimate_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        estimate_id INTEGER NOT NULL REFERENCES estimates (id),
+        item_name TEXT,
+        description TEXT,
+        qty INTEGER DEFAULT 0,
+        unit TEXT,
+        rate REAL DEFAULT 0,
+        row_total REAL DEFAULT 0,
+        hamali_rate REAL DEFAULT 0,
+        hamali_total REAL DEFAULT 0
+    );
+    """,
+
+    # 2 - indexes for the lookups used by the estimate, customer and item pages.
+    #     Older databases may hold repeated names / numbers (nothing enforced
+    #     them before): the first row keeps its value, later ones get their id
+    #     appended ("Cement (12)", "SRS007-12") so the unique indexes can be
+    #     built. Estimates reference customers by id, so nothing is lost;
+    #     renamed estimates get their own PDF path so a render never
+    #     overwrites the original's file.
+    """
+    UPDATE estimates SET
+        estimate_no = estimate_no || '-' || id,
+        pdf_path = 'bills/' || estimate_no || '-' || id || '.pdf'
+    WHERE id NOT IN (SELECT MIN(id) FROM estimates GROUP BY estimate_no);
+
+    UPDATE customers SET name = name || ' (' || id || ')'
+    WHERE id NOT IN (SELECT MIN(id) FROM customers GROUP BY name);
+
+    UPDATE items SET name = name || ' (' || id || ')'
+    WHERE id NOT IN (SELECT MIN(id) FROM items GROUP BY name);
+
+    CREATE INDEX IF NOT EXISTS idx_estimates_date
+        ON estimates (date);
+
+    CREATE INDEX IF NOT EXISTS idx_estimates_customer_date
+        ON estimates (customer_id, date);
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_estimates_estimate_no
+        ON estimates (estimate_no);
+
+    CREATE INDEX IF NOT EXISTS idx_estimate_items_estimate_id
+        ON estimate_items (estimate_id);
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_name
+        ON customers (name);
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_items_name
+        ON items (name);
+    """,
+
+    # 3 - counter table for race-free estimate numbers, seeded past the
+    #     highest number already issued
+    """
+    CREATE TABLE IF NOT EXISTS number_sequences (
+        name TEXT PRIMARY KEY,
+        prefix TEXT NOT NULL,
+        width INTEGER NOT NULL DEFAULT 3,
+        next_value INTEGER NOT NULL DEFAULT 1
+    );
+
+    INSERT OR IGNORE INTO number_sequences (name, prefix, width, next_value)
+    SELECT
+        'estimate',
+        'SRS',
+        3,
+        COALESCE(MAX(CAST(SUBSTR(estimate_no, 4) AS INTEGER)), 0) + 1
+    FROM estimates
+    WHERE estimate_no LIKE 'SRS%';
+    """,
+
+    # 4 - per-day estimate rollup for the monthly report, kept in sync by
+    #     triggers so reports read at most one row per day
+    """
+    CREATE TABLE IF NOT EXISTS estimate_daily_totals (
+        date TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        amount REAL NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+
+    INSERT OR REPLACE INTO estimate_daily_totals (date, count, amount)
+    SELECT date, COUNT(*), COALESCE(SUM(grand_total), 0)
+    FROM estimates
+    GROUP BY date;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_daily_insert
+    AFTER INSERT ON estimates
+    BEGIN
+        INSERT INTO estimate_daily_totals (date, count, amount)
+        VALUES (NEW.date, 1, COALESCE(NEW.grand_total, 0))
+        ON CONFLICT (date) DO UPDATE SET
+            count = count + 1,
+            amount = amount + excluded.amount;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_daily_update
+    AFTER UPDATE OF date, grand_total ON estimates
+    BEGIN
+        UPDATE estimate_daily_totals SET
+            count = count - 1,
+            amount = amount - COALESCE(OLD.grand_total, 0)
+        WHERE date = OLD.date;
+
+        DELETE FROM estimate_daily_totals
+        WHERE date = OLD.date AND count <= 0;
+
+        INSERT INTO estimate_daily_totals (date, count, amount)
+        VALUES (NEW.date, 1, COALESCE(NEW.grand_total, 0))
+        ON CONFLICT (date) DO UPDATE SET
+            count = count + 1,
+            amount = amount + excluded.amount;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_daily_delete
+    AFTER DELETE ON estimates
+    BEGIN
+        UPDATE estimate_daily_totals SET
+            count = count - 1,
+            amount = amount - COALESCE(OLD.grand_total, 0)
+        WHERE date = OLD.date;
+
+        DELETE FROM estimate_daily_totals
+        WHERE date = OLD.date AND count <= 0;
+    END;
+    """,
+
+    # 5 - all-time estimate counters for the dashboard (today's figures
+    #     come from estimate_daily_totals)
+    """
+    CREATE TABLE IF NOT EXISTS estimate_counters (
+        name TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        amount REAL NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+
+    INSERT OR REPLACE INTO estimate_counters (name, count, amount)
+    SELECT 'all', COUNT(*), COALESCE(SUM(grand_total), 0)
+    FROM estimates;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_counters_insert
+    AFTER INSERT ON estimates
+    BEGIN
+        UPDATE estimate_counters SET
+            count = count + 1,
+            amount = amount + COALESCE(NEW.grand_total, 0)
+        WHERE name = 'all';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_counters_update
+    AFTER UPDATE OF grand_total ON estimates
+    BEGIN
+        UPDATE estimate_counters SET
+            amount = amount - COALESCE(OLD.grand_total, 0) + COALESCE(NEW.grand_total, 0)
+        WHERE name = 'all';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimates_counters_delete
+    AFTER DELETE ON estimates
+    BEGIN
+        UPDATE estimate_counters SET
+            count = count - 1,
+            amount = amount - COALESCE(OLD.grand_total, 0)
+        WHERE name = 'all';
+    END;
+    """,
+
+    # 6 - full-text index over estimates, their customer and line items
+    #     (rowid = estimates.id), kept in sync by triggers
+    """
+    CREATE VIEW IF NOT EXISTS estimate_search_source AS
+    SELECT
+        e.id,
+        e.estimate_no,
+        c.name AS customer_name,
+        c.phone,
+        c.address,
+        (
+            SELECT group_concat(COALESCE(i.item_name, '') || ' ' || COALESCE(i.description, ''), ' ')
+            FROM estimate_items i
+            WHERE i.estimate_id = e.id
+        ) AS items
+    FROM estimates e
+    LEFT JOIN customers c ON e.customer_id = c.id;
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS estimate_search USING fts5 (
+        estimate_no,
+        customer_name,
+        phone,
+        address,
+        items,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );
+
+    INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+    SELECT * FROM estimate_search_source;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_insert
+    AFTER INSERT ON estimates
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = NEW.id;
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = NEW.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_update
+    AFTER UPDATE OF estimate_no, customer_id ON estimates
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = NEW.id;
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = NEW.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_delete
+    AFTER DELETE ON estimates
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = OLD.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_item_insert
+    AFTER INSERT ON estimate_items
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = NEW.estimate_id;
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = NEW.estimate_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_item_update
+    AFTER UPDATE ON estimate_items
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = NEW.estimate_id;
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = NEW.estimate_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_item_delete
+    AFTER DELETE ON estimate_items
+    BEGIN
+        DELETE FROM estimate_search WHERE rowid = OLD.estimate_id;
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id = OLD.estimate_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_search_customer_update
+    AFTER UPDATE OF name, phone, address ON customers
+    BEGIN
+        DELETE FROM estimate_search
+        WHERE rowid IN (SELECT id FROM estimates WHERE customer_id = NEW.id);
+        INSERT INTO estimate_search (rowid, estimate_no, customer_name, phone, address, items)
+        SELECT * FROM estimate_search_source WHERE id IN (
+            SELECT id FROM estimates WHERE customer_id = NEW.id
+        );
+    END;
+    """,
+
+    # 7 - trigram index for customer search (substring match on name,
+    #     phone, digits-only phone and address; rowid = customers.id)
+    """
+    CREATE VIEW IF NOT EXISTS customer_search_source AS
+    SELECT
+        id,
+        name,
+        phone,
+        REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
+            COALESCE(phone, ''), ' ', ''), '-', ''), '+', ''), '(', ''), ')', ''), '.', ''
+        ) AS phone_digits,
+        address
+    FROM customers;
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS customer_search USING fts5 (
+        name,
+        phone,
+        phone_digits,
+        address,
+        tokenize = 'trigram'
+    );
+
+    INSERT INTO customer_search (rowid, name, phone, phone_digits, address)
+    SELECT * FROM customer_search_source;
+
+    CREATE TRIGGER IF NOT EXISTS trg_customer_search_insert
+    AFTER INSERT ON customers
+    BEGIN
+        INSERT INTO customer_search (rowid, name, phone, phone_digits, address)
+        SELECT * FROM customer_search_source WHERE id = NEW.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_customer_search_update
+    AFTER UPDATE OF name, phone, address ON customers
+    BEGIN
+        DELETE FROM customer_search WHERE rowid = OLD.id;
+        INSERT INTO customer_search (rowid, name, phone, phone_digits, address)
+        SELECT * FROM customer_search_source WHERE id = NEW.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_customer_search_delete
+    AFTER DELETE ON customers
+    BEGIN
+        DELETE FROM customer_search WHERE rowid = OLD.id;
+    END;
+    """,
+
+    # 8 - per-table data version counters, bumped by triggers on every
+    #     write so in-process caches can tell (across processes too)
+    #     when their copy is stale
+    """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+
+    INSERT OR IGNORE INTO data_versions (name, version) VALUES ('items', 0);
+
+    CREATE TRIGGER IF NOT EXISTS trg_items_version_insert
+    AFTER INSERT ON items
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'items';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_items_version_update
+    AFTER UPDATE ON items
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'items';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_items_version_delete
+    AFTER DELETE ON items
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'items';
+    END;
+    """,
+
+    # 9 - data version counter for customers
+    """
+    INSERT OR IGNORE INTO data_versions (name, version) VALUES ('customers', 0);
+
+    CREATE TRIGGER IF NOT EXISTS trg_customers_version_insert
+    AFTER INSERT ON customers
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'customers';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_customers_version_update
+    AFTER UPDATE ON customers
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'customers';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_customers_version_delete
+    AFTER DELETE ON customers
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'customers';
+    END;
+    """,
+
+    # 10 - background PDF render status: pending / rendering / ready /
+    #      failed, with the render time and the last error
+    """
+    ALTER TABLE estimates ADD COLUMN pdf_status TEXT;
+    ALTER TABLE estimates ADD COLUMN pdf_render_ms INTEGER;
+    ALTER TABLE estimates ADD COLUMN pdf_error TEXT;
+    """,
+
+    # 11 - normalized name / phone keys for customer dedupe (bulk import,
+    #      customer_exists), kept up to date by customer_db
+    _add_customer_keys,
+
+    # 12 - data version counter for the estimate rollup, bumped whenever
+    #      estimate_daily_totals changes (estimate writes and rebuilds)
+    #      so the monthly report cache knows when to reload
+    """
+    INSERT OR IGNORE INTO data_versions (name, version) VALUES ('estimate_totals', 0);
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_totals_version_insert
+    AFTER INSERT ON estimate_daily_totals
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'estimate_totals';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_totals_version_update
+    AFTER UPDATE ON estimate_daily_totals
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'estimate_totals';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_totals_version_delete
+    AFTER DELETE ON estimate_daily_totals
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'estimate_totals';
+    END;
+    """,
+
+    # 13 - per-line search triggers rebuilt the estimate's whole FTS row
+    #      for every line (O(lines^2) per save); estimate_db re-indexes
+    #      once per estimate after writing its lines instead
+    """
+    DROP TRIGGER IF EXISTS trg_estimate_search_item_insert;
+    DROP TRIGGER IF EXISTS trg_estimate_search_item_update;
+    DROP TRIGGER IF EXISTS trg_estimate_search_item_delete;
+    """,
+
+    # 14 - trigram index over estimate numbers, so part of a number
+    #      ("007") matches through an index (rowid = estimates.id)
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS estimate_no_search USING fts5 (
+        estimate_no,
+        tokenize = 'trigram'
+    );
+
+    INSERT INTO estimate_no_search (rowid, estimate_no)
+    SELECT id, estimate_no FROM estimates;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_no_search_insert
+    AFTER INSERT ON estimates
+    BEGIN
+        INSERT INTO estimate_no_search (rowid, estimate_no)
+        VALUES (NEW.id, NEW.estimate_no);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_no_search_update
+    AFTER UPDATE OF estimate_no ON estimates
+    BEGIN
+        DELETE FROM estimate_no_search WHERE rowid = OLD.id;
+        INSERT INTO estimate_no_search (rowid, estimate_no)
+        VALUES (NEW.id, NEW.estimate_no);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_estimate_no_search_delete
+    AFTER DELETE ON estimates
+    BEGIN
+        DELETE FROM estimate_no_search WHERE rowid = OLD.id;
+    END;
+    """,
+]
+
+
+def _statements(script):
+    """Split a SQL script into complete statements (trigger bodies included)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement.strip()
+            statement = ""
+
+    if statement.strip():
+        yield statement.strip()
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Bring the database up to the latest schema version.
+
+    Each version is applied in its own transaction, so a failed step
+    leaves the database at the previous version. Returns the version
+    the database ends up at.
+    """
+    target = len(MIGRATIONS)
+    current = get_schema_version(conn)
+    if current >= target:
+        return current
+
+    for version in range(current + 1, target + 1):
+        step = MIGRATIONS[version - 1]
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock: another process may have migrated.
+            if get_schema_version(conn) >= version:
+                conn.execute("ROLLBACK")
+                continue
+
+            if callable(step):
+                step(conn)
+            else:
+                for statement in _statements(step):
+                    conn.execute(statement)
+
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error("Schema migration to version %s failed: %s", version, e)
+            raise
+
+        logger.info("Database schema migrated to version %s", version)
+
+    conn.execute("ANALYZE")
+
+    return target
+
+
+def main():
+    import argparse
+
+    from db.connection import get_connection
+    from db.estimate_db import rebuild_estimate_totals
+
+    parser = argparse.ArgumentParser(description="Database schema maintenance")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="status",
+        choices=["status", "rebuild-totals"],
+        help="status: show schema version (migrating if needed); "
+             "rebuild-totals: recompute the estimate rollup tables"
+    )
+    args = parser.parse_args()
+
+    conn = get_connection()
+
+    if args.command == "rebuild-totals":
+        rebuild_estimate_totals()
+        print("Estimate totals rebuilt")
+
+    print(f"Schema version: {get_schema_version(conn)} (latest {len(MIGRATIONS)})")
+
+
+if __name__ == "__main__":
+    main()
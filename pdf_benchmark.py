@@ -0,0 +1,70 @@
+import argparse
+import time
+
+from utilities.pdf_generator_utils import COMPANY_INFO, generate_estimate_pdf
+
+
+def sample_render_args(item_count):
+    items = [
+        {
+            "item_name": f"Item {i}",
+            "desc": "53 grade OPC" if i % 2 else "",
+            "qty": i % 7 + 1,
+            "unit": "bag",
+            "rate": 350.0 + i,
+            "hamali_rate": 5.0
+        }
+        for i in range(item_count)
+    ]
+    items_total = sum(item["qty"] * item["rate"] for item in items)
+    hamali_total = sum(item["qty"] * item["hamali_rate"] for item in items)
+
+    return {
+        "estimate": {"estimate_number": "SRS001", "date": "2025-01-01"},
+        "company_info": COMPANY_INFO,
+        "customer": {"name": "Sample Customer", "phone": "9876543210", "address": "Huzurabad"},
+        "items": items,
+        "filename": None,
+        "notes": "",
+        "totals": {
+            "items_total": items_total,
+            "hamali_total": hamali_total,
+            "auto_charge": 200.0,
+            "discount": 100.0,
+            "grand_total": items_total + hamali_total + 100.0
+        }
+    }
+
+
+def run(renders, item_count):
+    render_args = sample_render_args(item_count)
+
+    # Warm-up (imports, font metrics, first-use caches)
+    generate_estimate_pdf(**render_args)
+
+    start = time.perf_counter()
+    for _ in range(renders):
+        generate_estimate_pdf(**render_args)
+    elapsed = time.perf_counter() - start
+
+    return renders / elapsed
+
+
+def main():
+    import logging
+
+    parser = argparse.ArgumentParser(
+        description="Render a sample estimate in memory repeatedly and report renders/sec"
+    )
+    parser.add_argument("--renders", type=int, default=300)
+    parser.add_argument("--items", type=int, default=10, help="line items per estimate")
+    args = parser.parse_args()
+
+    logging.getLogger("utilities.pdf_generator_utils").setLevel(logging.WARNING)
+
+    rate = run(args.renders, args.items)
+    print(f"{args.renders} renders, {args.items} items each: {rate:.1f} renders/sec")
+
+
+if __name__ == "__main__":
+    main()
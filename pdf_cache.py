@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from utilities.pdf_generator_utils import PDF_LAYOUT_VERSION, generate_estimate_pdf
+
+CACHE_DIR = os.path.join("bills", ".cache")
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+MAX_DISK_BYTES = 512 * 1024 * 1024
+
+# Rendered PDFs keyed by a hash of everything that goes into them, so an
+# unchanged estimate is never rendered twice. Most recently used entries
+# stay in memory (up to MAX_MEMORY_BYTES); every entry is also kept on
+# disk, which survives restarts and is shared between processes. The disk
+# store is pruned to MAX_DISK_BYTES, least recently used (mtime) first,
+# and files of other layout versions are removed.
+_lock = threading.Lock()
+_entries = OrderedDict()
+_memory_bytes = 0
+_disk_bytes = None  # this process's running total, from the first scan
+
+
+def cache_key(render_args):
+    """sha256 of the generate_estimate_pdf() arguments (except the file name) and layout version."""
+    payload = {key: value for key, value in render_args.items() if key != "filename"}
+    payload["layout_version"] = PDF_LAYOUT_VERSION
+
+    data = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _disk_prefix():
+    return f"v{PDF_LAYOUT_VERSION}-"
+
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, f"{_disk_prefix()}{key}.pdf")
+
+
+def _disk_entries():
+    """(mtime, size, path) of the current layout's files; other layouts' files are deleted."""
+    try:
+        names = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return []
+
+    entries = []
+    for name in names:
+        if not name.endswith(".pdf"):
+            continue
+
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            if not name.startswith(_disk_prefix()):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Pruned by another process meanwhile
+            continue
+
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    return entries
+
+
+def prune_disk(max_bytes=None):
+    """
+    Shrink the disk store to `max_bytes` (default MAX_DISK_BYTES),
+    deleting the least recently used files first. Returns the bytes kept.
+    """
+    global _disk_bytes
+
+    if max_bytes is None:
+        max_bytes = MAX_DISK_BYTES
+
+    entries = sorted(_disk_entries())
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    with _lock:
+        _disk_bytes = total
+    return total
+
+
+def _remember(key, data):
+    global _memory_bytes
+
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            return
+
+        _entries[key] = data
+        _memory_bytes += len(data)
+
+        while _memory_bytes > MAX_MEMORY_BYTES and len(_entries) > 1:
+            _, evicted = _entries.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def get(key):
+    with _lock:
+        data = _entries.get(key)
+        if data is not None:
+            _entries.move_to_end(key)
+            return data
+
+    path = _disk_path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        # Mark as recently used for prune_disk()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+
+    _remember(key, data)
+    return data
+
+
+def put(key, data):
+    global _disk_bytes
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    path = _disk_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    with _lock:
+        if _disk_bytes is not None:
+            _disk_bytes += len(data)
+        over = _disk_bytes is None or _disk_bytes > MAX_DISK_BYTES
+
+    # The first put of a process scans the store (dropping old layouts)
+    if over:
+        prune_disk()
+
+    _remember(key, data)
+
+
+def render_pdf(render_args, refresh=False):
+    """
+    PDF bytes for generate_estimate_pdf() arguments, rendered in memory
+    only on a cache miss (or always with refresh=True).
+    Returns (bytes, rendered).
+    """
+    key = cache_key(render_args)
+
+    if not refresh:
+        data = get(key)
+        if data is not None:
+            return data, False
+
+    data = generate_estimate_pdf(**{**render_args, "filename": None})
+    put(key, data)
+    return data, True
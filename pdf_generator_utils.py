@@ -1,15 +1,31 @@
-from reportlab.lib.pagesizes import A5
+from reportlab.lib.pagesizes import A4, A5
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib.units import mm
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from .template_manager import TemplateManager
+import io
 import os
 import logging
+from functools import lru_cache
+from itertools import chain, groupby
+from xml.sax.saxutils import escape
 
 logger = logging.getLogger(__name__)
 
+# Company details printed on estimates (the page and the bulk regeneration
+# command must render the same header)
+COMPANY_INFO = {
+    "name": "Sri Rama Steel & Cement",
+    "phone": "8885482288",
+    "address": "Warangal Road, Huzurabad"
+}
+
+# Bump whenever generate_estimate_pdf() output changes, so cached PDFs
+# rendered with the old layout are no longer served
+PDF_LAYOUT_VERSION = 1
+
 # Create styles
 styles = getSampleStyleSheet()
 styles.add(ParagraphStyle(
@@ -23,6 +39,152 @@ styles.add(ParagraphStyle(
     alignment=TA_CENTER
 ))
 
+# ---------------- ESTIMATE STYLE REGISTRY ----------------
+# Everything in the estimate layout that does not depend on the data is
+# built once at import and shared by every render (reportlab only reads
+# styles, so sharing across threads is safe).
+ESTIMATE_PAGE_MARGIN = 20
+ESTIMATE_AVAILABLE_WIDTH = A5[0] - 2 * ESTIMATE_PAGE_MARGIN
+
+ESTIMATE_STYLES = {
+    'company_name': ParagraphStyle(
+        'CompanyNameStyle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        alignment=TA_CENTER,
+        textColor=colors.black,
+        spaceAfter=0,
+        spaceBefore=0,
+        fontName='Helvetica-Bold'
+    ),
+    'title': ParagraphStyle(
+        'EstimateTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        alignment=TA_CENTER,
+        textColor=colors.black,
+        fontName='Helvetica-Bold',
+        spaceAfter=6,
+        spaceBefore=4
+    ),
+    'address': ParagraphStyle(
+        'Address',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_CENTER
+    ),
+    'contact': ParagraphStyle(
+        'Contact',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_CENTER,
+        spaceAfter=4
+    ),
+}
+
+BILL_TO_COL_WIDTHS = [ESTIMATE_AVAILABLE_WIDTH * 0.5, ESTIMATE_AVAILABLE_WIDTH * 0.5]
+
+BILL_TO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.8, 0.8, 0.8)),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, 1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('ALIGN', (0, 1), (-1, 1), 'LEFT'),
+
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+])
+
+ITEMS_COL_WIDTHS = [
+    ESTIMATE_AVAILABLE_WIDTH * 0.15,   # Qty column (includes unit)
+    ESTIMATE_AVAILABLE_WIDTH * 0.55,   # Item & Description column
+    ESTIMATE_AVAILABLE_WIDTH * 0.15,   # Rate column
+    ESTIMATE_AVAILABLE_WIDTH * 0.15    # Amount column
+]
+
+ITEMS_HEADER_ROW = ['Qty', 'Item & Description', 'Rate', 'Amount']
+
+BOLD_TOTAL_LABELS = ('Sub Total:', 'Discount:', 'Grand Total:')
+
+
+@lru_cache(maxsize=512)
+def items_table_style(items_count, total_labels):
+    """
+    TableStyle for the items + totals table, built once per shape
+    (number of item rows and the labels of the totals rows below them).
+    """
+    table_style_commands = [
+        # Header row styling
+        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.75, 0.75, 0.75)),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+        # Items rows styling
+        ('FONTNAME', (0, 1), (-1, items_count), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, items_count), 8),
+        ('ALIGN', (0, 1), (0, items_count), 'LEFT'),          # Item descriptions left
+        ('ALIGN', (1, 1), (-1, items_count), 'LEFT'),        # Qty, Rate, Amount right
+        ('ALIGN', (2, 1), (-1, items_count), 'RIGHT'),
+        ('VALIGN', (0, 1), (-1, items_count), 'TOP'),         # Top align for multi-line
+
+        # Complete borders for items
+        ('GRID', (0, 0), (-1, items_count), 1, colors.black),
+        ('BOX', (0, 0), (-1, items_count), 1, colors.black),
+    ]
+
+    if total_labels:
+        totals_start_row = items_count + 1
+        totals_end_row = items_count + len(total_labels)
+
+        # Merge columns for totals
+        for row in range(totals_start_row, totals_end_row + 1):
+            table_style_commands.append(('SPAN', (0, row), (1, row)))
+            table_style_commands.append(('SPAN', (2, row), (3, row)))
+
+        table_style_commands.extend([
+            # General formatting for ALL totals rows
+            ('FONTSIZE', (0, totals_start_row), (0, totals_end_row), 10),
+            ('ALIGN', (0, totals_start_row), (0, totals_end_row), 'LEFT'),
+            ('LEFTPADDING', (0, totals_start_row), (0, totals_end_row), 8),
+
+            ('FONTSIZE', (2, totals_start_row), (2, totals_end_row), 10),
+            ('ALIGN', (2, totals_start_row), (2, totals_end_row), 'RIGHT'),
+            ('RIGHTPADDING', (2, totals_start_row), (2, totals_end_row), 8),
+
+            # Complete borders for totals
+            ('GRID', (0, totals_start_row), (-1, totals_end_row), 1, colors.black),
+            ('BOX', (0, totals_start_row), (-1, totals_end_row), 1, colors.black),
+        ])
+
+        # Bold only the important totals, charges (Hamali, Auto) stay normal weight
+        for i, label in enumerate(total_labels, totals_start_row):
+            font = 'Helvetica-Bold' if label in BOLD_TOTAL_LABELS else 'Helvetica'
+            table_style_commands.extend([
+                ('FONTNAME', (0, i), (0, i), font),
+                ('FONTNAME', (2, i), (2, i), font),
+            ])
+
+    # Standard padding
+    table_style_commands.extend([
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ])
+
+    return TableStyle(table_style_commands)
+
+
 def add_refined_border(canvas, doc):
     """
     Add refined 1pt border around all sides of A5 page (20pt spacing)
@@ -404,46 +566,25 @@ def generate_estimate_pdf(
 
     """
     Generate ESTIMATE PDF with Quantity + Unit combined in same cell
+
+    With filename=None the PDF is rendered in memory and its bytes are
+    returned instead of being written to disk. Styles come from the
+    registry above; only the data is filled in here.
     """
     try:
+        buffer = io.BytesIO() if filename is None else None
+
         doc = SimpleDocTemplate(
-            filename,
+            filename if buffer is None else buffer,
             pagesize=A5,
-            rightMargin=20,
-            leftMargin=20,
-            topMargin=20,
-            bottomMargin=20
+            rightMargin=ESTIMATE_PAGE_MARGIN,
+            leftMargin=ESTIMATE_PAGE_MARGIN,
+            topMargin=ESTIMATE_PAGE_MARGIN,
+            bottomMargin=ESTIMATE_PAGE_MARGIN
         )
 
         elements = []
 
-        # Maximum available width
-        page_width, _ = A5
-        available_width = page_width - 40
-
-        # Company header styles
-        company_name_style = ParagraphStyle(
-            'CompanyNameStyle',
-            parent=styles['Heading1'],
-            fontSize=14,
-            alignment=TA_CENTER,
-            textColor=colors.black,
-            spaceAfter=0,
-            spaceBefore=0,
-            fontName='Helvetica-Bold'
-        )
-
-        estimate_title_style = ParagraphStyle(
-            'EstimateTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            alignment=TA_CENTER,
-            textColor=colors.black,
-            fontName='Helvetica-Bold',
-            spaceAfter=6,
-            spaceBefore=4
-        )
-
         # Company header
         company_name = 'Sri Rama Steel & Cement'
         company_address = 'Warangal Road, Huzurabad, Telangana'
@@ -455,15 +596,11 @@ def generate_estimate_pdf(
             phone = company_info.get('phone', '8885482288, 6303417269')
             company_contact = f'GSTIN: 36AVBPT8804D1ZJ | Ph: {phone}'
 
-        elements.append(Paragraph(company_name, company_name_style))
-        elements.append(Paragraph(company_address,
-                                ParagraphStyle('Address', parent=styles['Normal'],
-                                             fontSize=10, alignment=TA_CENTER)))
-        elements.append(Paragraph(company_contact,
-                                ParagraphStyle('Contact', parent=styles['Normal'],
-                                             fontSize=10, alignment=TA_CENTER, spaceAfter=4)))
+        elements.append(Paragraph(company_name, ESTIMATE_STYLES['company_name']))
+        elements.append(Paragraph(company_address, ESTIMATE_STYLES['address']))
+        elements.append(Paragraph(company_contact, ESTIMATE_STYLES['contact']))
 
-        elements.append(Paragraph('ESTIMATE', estimate_title_style))
+        elements.append(Paragraph('ESTIMATE', ESTIMATE_STYLES['title']))
 
         # Bill To + Estimate Details
         customer_name = customer.get("name", "Customer Name")
@@ -487,47 +624,15 @@ def generate_estimate_pdf(
             ]
         ]
 
-        bill_to_estimate_table = Table(bill_to_estimate_data, colWidths=[available_width * 0.5, available_width * 0.5])
-        bill_to_estimate_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.8, 0.8, 0.8)),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, 1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 1), (-1, 1), 'LEFT'),
-
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-        ]))
+        bill_to_estimate_table = Table(bill_to_estimate_data, colWidths=BILL_TO_COL_WIDTHS)
+        bill_to_estimate_table.setStyle(BILL_TO_TABLE_STYLE)
 
         elements.append(bill_to_estimate_table)
 
-        
-
         # 4-COLUMN LAYOUT with Quantity + Unit combined
-        col_widths = [
-            available_width * 0.15,   # Item & Description column (wider)
-            available_width * 0.55,   # Qty column (now includes unit)
-            available_width * 0.15,   # Rate column
-            available_width * 0.15    # Amount column
-        ]
-
-        combined_table_data = [
-            ['Qty', 'Item & Description', 'Rate', 'Amount'],  # Same 4 columns
-        ]
-
-        
+        combined_table_data = [ITEMS_HEADER_ROW]
 
         # Add items with combined Item Name + Description AND Quantity + Unit
-        item_rows_count = 0 
         for item in items:
             # ---- SKIP EMPTY / INVALID ROWS ----
             if not item.get("item_name"):
@@ -560,10 +665,8 @@ def generate_estimate_pdf(
                 f"{item_rate:.2f}",
                 f"{item_amount:.2f}"
             ])
-            item_rows_count += 1
-
-
 
+        items_count = len(combined_table_data) - 1
 
         # ---- TOTALS BREAKDOWN ----
         items_total = totals.get("items_total", 0)
@@ -592,89 +695,222 @@ def generate_estimate_pdf(
         # Final total
         combined_table_data.append(['Grand Total:', '', f'{running_total:.2f}', ''])
 
-        # Calculate table styling indices
-        items_count = item_rows_count
-        totals_start_row = items_count + 1  # header + item rows
+        total_labels = tuple(row[0] for row in combined_table_data[items_count + 1:])
 
-        combined_table = Table(combined_table_data, colWidths=col_widths)
+        combined_table = Table(combined_table_data, colWidths=ITEMS_COL_WIDTHS)
+        combined_table.setStyle(items_table_style(items_count, total_labels))
+        elements.append(combined_table)
 
-        # Build table style
-        table_style_commands = [
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.75, 0.75, 0.75)),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        # Build PDF
+        doc.build(elements, onFirstPage=add_refined_border, onLaterPages=add_refined_border)
 
-            # Items rows styling
-            ('FONTNAME', (0, 1), (-1, items_count), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, items_count), 8),
-            ('ALIGN', (0, 1), (0, items_count), 'LEFT'),          # Item descriptions left
-            ('ALIGN', (1, 1), (-1, items_count), 'LEFT'),        # Qty, Rate, Amount right
-            ('ALIGN', (2, 1), (-1, items_count), 'RIGHT'),
-            ('VALIGN', (0, 1), (-1, items_count), 'TOP'),         # Top align for multi-line
+        logger.info(f"ESTIMATE PDF generated successfully: {filename or estimate_no}")
 
-            # Complete borders for items
-            ('GRID', (0, 0), (-1, items_count), 1, colors.black),
-            ('BOX', (0, 0), (-1, items_count), 1, colors.black),
-        ]
+        if buffer is not None:
+            return buffer.getvalue()
 
-        # Add totals styling if needed
-        if len(combined_table_data) > items_count + 1:
-            totals_end_row = len(combined_table_data) - 1
+    except Exception as e:
+        logger.error(f"Error generating ESTIMATE PDF: {str(e)}")
+        raise
 
-            # Merge columns for totals (now spans 0-1 instead of 0-1)
-            for row in range(totals_start_row, totals_end_row + 1):
-                table_style_commands.append(('SPAN', (0, row), (1, row)))
-                table_style_commands.append(('SPAN', (2, row), (3, row)))
 
-            # Style totals with selective bold formatting
-            table_style_commands.extend([
-            # General formatting for ALL totals rows
-            ('FONTSIZE', (0, totals_start_row), (0, totals_end_row), 10),
-            ('ALIGN', (0, totals_start_row), (0, totals_end_row), 'LEFT'),
-            ('LEFTPADDING', (0, totals_start_row), (0, totals_end_row), 8),
+# ---------------- CUSTOMER STATEMENT ----------------
+STATEMENT_PAGE_MARGIN = 15 * mm
+STATEMENT_AVAILABLE_WIDTH = A4[0] - 2 * STATEMENT_PAGE_MARGIN
+
+STATEMENT_STYLES = {
+    'title': ParagraphStyle(
+        'StatementTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        spaceAfter=6,
+        spaceBefore=4
+    ),
+    'details': ParagraphStyle(
+        'StatementDetails',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=13,
+        spaceAfter=8
+    ),
+}
+
+STATEMENT_COL_WIDTHS = [
+    STATEMENT_AVAILABLE_WIDTH * 0.50,   # Item & Description
+    STATEMENT_AVAILABLE_WIDTH * 0.16,   # Qty
+    STATEMENT_AVAILABLE_WIDTH * 0.16,   # Rate
+    STATEMENT_AVAILABLE_WIDTH * 0.18    # Amount
+]
+
+STATEMENT_HEADER_ROW = ['Item & Description', 'Qty', 'Rate', 'Amount']
+
+
+@lru_cache(maxsize=512)
+def statement_table_style(items_count, charges_count):
+    """
+    TableStyle for one estimate of a statement: title row, column header,
+    item rows, charge rows (Hamali / Auto / Discount) and the subtotal.
+    """
+    last_item_row = items_count + 1
+    subtotal_row = last_item_row + charges_count + 1
+
+    table_style_commands = [
+        # Estimate title row
+        ('SPAN', (0, 0), (-1, 0)),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.8, 0.8, 0.8)),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+
+        # Column header row
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, 1), 9),
+        ('ALIGN', (1, 1), (-1, 1), 'RIGHT'),
+
+        # Item and charge rows
+        ('FONTNAME', (0, 2), (-1, subtotal_row - 1), 'Helvetica'),
+        ('FONTSIZE', (0, 2), (-1, subtotal_row - 1), 8),
+        ('ALIGN', (1, 2), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+
+        # Estimate subtotal
+        ('FONTNAME', (0, subtotal_row), (-1, subtotal_row), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, subtotal_row), (-1, subtotal_row), 9),
+        ('LINEABOVE', (0, subtotal_row), (-1, subtotal_row), 1, colors.black),
+
+        ('GRID', (0, 1), (-1, last_item_row), 0.5, colors.grey),
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),
+
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ]
+
+    return TableStyle(table_style_commands)
+
+
+STATEMENT_SUMMARY_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.Color(0.9, 0.9, 0.9)),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+])
+
+
+def _statement_estimate_table(estimate, lines):
+    """One LongTable per estimate; title and column header repeat on page breaks."""
+    table_data = [
+        [f"Estimate {estimate['estimate_no']}  -  {estimate['date']}", '', '', ''],
+        STATEMENT_HEADER_ROW
+    ]
+
+    items_count = 0
+    for line in lines:
+        # ---- SKIP EMPTY / INVALID ROWS (as on the estimate PDF) ----
+        if not line['item_name'] or (line['qty'] or 0) <= 0 or (line['rate'] or 0) <= 0:
+            continue
+
+        item_text = line['item_name']
+        if line['description'] and line['description'].strip():
+            item_text += f"\n{line['description']}"
+
+        table_data.append([
+            item_text,
+            f"{line['qty']} {line['unit'] or ''}".strip(),
+            f"{line['rate']:.2f}",
+            f"{line['row_total']:.2f}"
+        ])
+        items_count += 1
 
-            ('FONTSIZE', (2, totals_start_row), (2, totals_end_row), 10),
-            ('ALIGN', (2, totals_start_row), (2, totals_end_row), 'RIGHT'),
-            ('RIGHTPADDING', (2, totals_start_row), (2, totals_end_row), 8),
+    charges_count = 0
+    for label, key, sign in (('Hamali', 'hamali_total', 1), ('Auto', 'auto_charge', 1), ('Discount', 'discount', -1)):
+        amount = estimate[key] or 0
+        if amount > 0:
+            table_data.append([label, '', '', f"{sign * amount:.2f}"])
+            charges_count += 1
 
-            # Complete borders for totals
-            ('GRID', (0, totals_start_row), (-1, totals_end_row), 1, colors.black),
-            ('BOX', (0, totals_start_row), (-1, totals_end_row), 1, colors.black),
-            ])
+    table_data.append(['Estimate Total', '', '', f"{estimate['grand_total'] or 0:.2f}"])
 
-            # Apply selective bold styling only to important totals (not charges)
-            for i, row_data in enumerate(combined_table_data[totals_start_row:], totals_start_row):
-                if row_data[0] in ['Sub Total:', 'Discount:', 'Grand Total:']:
-                    table_style_commands.extend([
-                        ('FONTNAME', (0, i), (0, i), 'Helvetica-Bold'),  # Bold label
-                        ('FONTNAME', (2, i), (2, i), 'Helvetica-Bold'),  # Bold amount
-                    ])
-                else:
-                    # For charges (Hamali, Auto) - use normal weight
-                    table_style_commands.extend([
-                        ('FONTNAME', (0, i), (0, i), 'Helvetica'),      # Light label
-                        ('FONTNAME', (2, i), (2, i), 'Helvetica'),      # Light amount
-                    ])
+    table = LongTable(table_data, colWidths=STATEMENT_COL_WIDTHS, repeatRows=2)
+    table.setStyle(statement_table_style(items_count, charges_count))
+    return table
 
-            
-        # Standard padding
-        table_style_commands.extend([
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ])
 
-        combined_table.setStyle(TableStyle(table_style_commands))
-        elements.append(combined_table)
+def generate_customer_statement_pdf(
+    customer,
+    rows,
+    filename=None,
+    start_date=None,
+    end_date=None,
+    company_info=None
+):
+    """
+    Consolidated statement of a customer's estimates.
 
-        # Build PDF
-        doc.build(elements, onFirstPage=add_refined_border, onLaterPages=add_refined_border)
+    `rows` is an iterator of estimate lines ordered by estimate (see
+    estimate_db.iter_customer_statement); it is consumed one estimate at
+    a time. Returns the PDF bytes when filename is None.
+    """
+    try:
+        company_info = company_info or COMPANY_INFO
+        buffer = io.BytesIO() if filename is None else None
+
+        doc = SimpleDocTemplate(
+            filename if buffer is None else buffer,
+            pagesize=A4,
+            rightMargin=STATEMENT_PAGE_MARGIN,
+            leftMargin=STATEMENT_PAGE_MARGIN,
+            topMargin=STATEMENT_PAGE_MARGIN,
+            bottomMargin=STATEMENT_PAGE_MARGIN,
+            title=f"Statement - {customer.get('name', '')}"
+        )
 
-        logger.info(f"ESTIMATE PDF generated successfully: {filename}")
+        elements = [
+            Paragraph(company_info.get('name', ''), ESTIMATE_STYLES['company_name']),
+            Paragraph(company_info.get('address', ''), ESTIMATE_STYLES['address']),
+            Paragraph(f"Ph: {company_info.get('phone', '')}", ESTIMATE_STYLES['contact']),
+            Paragraph('STATEMENT OF ESTIMATES', STATEMENT_STYLES['title'])
+        ]
+
+        period = f"{start_date or 'Beginning'} to {end_date or 'Today'}"
+        customer_lines = [f"<b>{escape(customer.get('name', ''))}</b>"]
+        for key in ('phone', 'address'):
+            if customer.get(key):
+                customer_lines.append(escape(customer[key]))
+        customer_lines.append(f"Period: {period}")
+
+        elements.append(Paragraph("<br/>".join(customer_lines), STATEMENT_STYLES['details']))
+
+        estimate_count = 0
+        statement_total = 0
+
+        for _, lines in groupby(rows, key=lambda row: row['id']):
+            first = next(lines)
+            elements.append(_statement_estimate_table(first, chain([first], lines)))
+            elements.append(Spacer(1, 4 * mm))
+
+            estimate_count += 1
+            statement_total += first['grand_total'] or 0
+
+        summary = Table(
+            [[f"{estimate_count} estimate(s)", f"Total: {statement_total:.2f}"]],
+            colWidths=[STATEMENT_AVAILABLE_WIDTH * 0.5, STATEMENT_AVAILABLE_WIDTH * 0.5]
+        )
+        summary.setStyle(STATEMENT_SUMMARY_STYLE)
+        elements.append(summary)
+
+        doc.build(elements)
+
+        logger.info(f"Statement PDF generated: {customer.get('name', '')}, {estimate_count} estimates")
+
+        if buffer is not None:
+            return buffer.getvalue()
 
     except Exception as e:
-        logger.error(f"Error generating ESTIMATE PDF: {str(e)}")
+        logger.error(f"Error generating statement PDF: {str(e)}")
         raise
@@ -0,0 +1,318 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from db.estimate_db import (
+    clear_pdf_status,
+    estimate_pdf_path,
+    get_estimate_by_id,
+    get_estimate_ids,
+    get_pdf_status,
+    set_pdf_status
+)
+from utilities.pdf_cache import render_pdf
+from utilities.pdf_generator_utils import COMPANY_INFO
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 2
+
+# Shared by every session in the process. Saving only queues the render;
+# the job writes the PDF and records the outcome on the estimate row
+# (pdf_status / pdf_render_ms / pdf_error), which the pages poll.
+_executor = None
+_executor_lock = threading.Lock()
+
+# estimate id -> generation of its newest job. A job for an estimate that
+# was saved again meanwhile is stale: its output is dropped so an older
+# render never replaces a newer one.
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+# ---------------- RENDER FROM THE DATABASE ----------------
+def estimate_render_args(estimate_id):
+    """generate_estimate_pdf() arguments for a saved estimate."""
+    header, items = get_estimate_by_id(estimate_id)
+
+    for item in items:
+        item["desc"] = item["desc"] or ""
+
+    return {
+        "estimate": {
+            "estimate_number": header["estimate_no"],
+            "date": header["date"]
+        },
+        "company_info": COMPANY_INFO,
+        "customer": {
+            "name": header["customer_name"] or "",
+            "phone": header["phone"] or "",
+            "address": header["address"] or ""
+        },
+        "items": items,
+        "filename": header["pdf_path"] or estimate_pdf_path(header["estimate_no"]),
+        "notes": "",
+        "totals": {
+            "items_total": header["items_total"] or 0,
+            "hamali_total": header["hamali_total"] or 0,
+            "auto_charge": header["auto_charge"] or 0,
+            "discount": header["discount"] or 0,
+            "grand_total": header["grand_total"] or 0
+        }
+    }
+
+
+def _render_to_temp(render_args, tag, refresh=False):
+    """
+    Render (or take from the PDF cache) and write next to the target
+    file; returns (temp path, render ms).
+    """
+    filename = render_args["filename"]
+    tmp_path = f"{filename}.{tag}.tmp"
+
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    data, _ = render_pdf(render_args, refresh=refresh)
+    render_ms = int((time.perf_counter() - start) * 1000)
+
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+
+    return tmp_path, render_ms
+
+
+def get_estimate_pdf(estimate_id):
+    """
+    PDF bytes of a saved estimate for download - the file the worker wrote
+    when it is ready, otherwise rendered (or taken from the PDF cache).
+    """
+    pdf = get_pdf_status(estimate_id)
+
+    if pdf and pdf["pdf_status"] == "ready" and pdf["pdf_path"] and os.path.exists(pdf["pdf_path"]):
+        try:
+            with open(pdf["pdf_path"], "rb") as f:
+                return f.read()
+        except OSError:
+            logger.warning("Could not read %s, rendering instead", pdf["pdf_path"])
+
+    data, _ = render_pdf(estimate_render_args(estimate_id))
+    return data
+
+
+# ---------------- BACKGROUND QUEUE (APP) ----------------
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            # Jobs queued by an earlier process died with it - their
+            # estimates would otherwise show "rendering" forever
+            stale = clear_pdf_status("rendering")
+            if stale:
+                logger.info("Cleared %s stale 'rendering' PDF statuses", stale)
+
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS,
+                thread_name_prefix="pdf-render"
+            )
+        return _executor
+
+
+def start_worker():
+    """Start this process's render queue (once), clearing stale statuses."""
+    _get_executor()
+
+
+def _is_current(estimate_id, generation):
+    return _generations.get(estimate_id) == generation
+
+
+def _render(estimate_id, generation):
+    try:
+        render_args = estimate_render_args(estimate_id)
+        tmp_path, render_ms = _render_to_temp(render_args, generation)
+    except Exception as e:
+        logger.exception("PDF render failed for estimate %s", estimate_id)
+        with _generations_lock:
+            if _is_current(estimate_id, generation):
+                set_pdf_status(estimate_id, "failed", error=str(e))
+        return
+
+    with _generations_lock:
+        if not _is_current(estimate_id, generation):
+            os.remove(tmp_path)
+            return
+
+        # Swap the finished file in so a download never sees a half-written PDF
+        os.replace(tmp_path, render_args["filename"])
+        set_pdf_status(estimate_id, "ready", render_ms=render_ms)
+
+    logger.info("Rendered %s in %s ms", render_args["filename"], render_ms)
+
+
+def submit_render(estimate_id):
+    """
+    Queue the PDF for a saved estimate and return immediately.
+
+    The job renders from the committed rows, so it always matches what
+    was saved. The estimate is marked "rendering" before this returns.
+    """
+    with _generations_lock:
+        generation = _generations.get(estimate_id, 0) + 1
+        _generations[estimate_id] = generation
+        set_pdf_status(estimate_id, "rendering")
+
+    return _get_executor().submit(_render, estimate_id, generation)
+
+
+# ---------------- BULK REGENERATION (COMMAND LINE) ----------------
+def _regenerate_one(estimate_id):
+    """Process pool job: returns (estimate id, file name, render ms, error)."""
+    filename = None
+    try:
+        render_args = estimate_render_args(estimate_id)
+        filename = render_args["filename"]
+        tmp_path, render_ms = _render_to_temp(render_args, os.getpid(), refresh=True)
+        os.replace(tmp_path, filename)
+    except Exception as e:
+        return estimate_id, filename, None, str(e)
+
+    return estimate_id, filename, render_ms, None
+
+
+def _read_manifest(path):
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                done[entry["id"]] = entry
+
+    return done
+
+
+def regenerate_pdfs(estimate_ids, workers=None, manifest_path=None, progress=print):
+    """
+    Re-render the PDFs of the given estimates across a process pool.
+
+    Every finished file is appended to the manifest (id, file, render ms)
+    so an interrupted run picks up where it stopped; ids already listed
+    there are skipped. Returns (timings, failures) for this run.
+    """
+    done = _read_manifest(manifest_path) if manifest_path else {}
+    pending = [estimate_id for estimate_id in estimate_ids if estimate_id not in done]
+
+    if done:
+        progress(f"Resuming: {len(estimate_ids) - len(pending)} already done")
+
+    timings = []
+    failures = []
+    if not pending:
+        return timings, failures
+
+    manifest = open(manifest_path, "a") if manifest_path else None
+
+    # spawn, not fork: children must open their own SQLite connections
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [pool.submit(_regenerate_one, estimate_id) for estimate_id in pending]
+
+        for count, future in enumerate(as_completed(futures), 1):
+            estimate_id, filename, render_ms, error = future.result()
+
+            if error:
+                failures.append((estimate_id, filename, error))
+                set_pdf_status(estimate_id, "failed", error=error)
+                progress(f"[{count}/{len(pending)}] {filename or estimate_id}  FAILED: {error}")
+                continue
+
+            timings.append((estimate_id, filename, render_ms))
+            set_pdf_status(estimate_id, "ready", render_ms=render_ms)
+            progress(f"[{count}/{len(pending)}] {filename}  {render_ms} ms")
+
+            if manifest:
+                manifest.write(json.dumps({
+                    "id": estimate_id,
+                    "file": filename,
+                    "render_ms": render_ms
+                }) + "\n")
+                manifest.flush()
+
+    if manifest:
+        manifest.close()
+
+    return timings, failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Regenerate estimate PDFs from the database"
+    )
+    parser.add_argument("--from", dest="start_date", help="first date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="last date (YYYY-MM-DD)")
+    parser.add_argument("--numbers", nargs="+", help="estimate numbers, e.g. SRS001 SRS002")
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument(
+        "--manifest",
+        default=os.path.join("bills", ".regenerate.jsonl"),
+        help="progress file used to resume an interrupted run"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the progress of an earlier unfinished run"
+    )
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.manifest):
+        os.remove(args.manifest)
+
+    estimate_ids = get_estimate_ids(args.start_date, args.end_date, args.numbers)
+    print(f"{len(estimate_ids)} estimates selected")
+
+    os.makedirs(os.path.dirname(args.manifest) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    timings, failures = regenerate_pdfs(
+        estimate_ids,
+        workers=args.workers,
+        manifest_path=args.manifest
+    )
+    elapsed = time.perf_counter() - start
+
+    if timings:
+        render_ms = sorted(ms for _, _, ms in timings)
+        print(
+            f"\nRendered {len(timings)} PDFs in {elapsed:.1f} s "
+            f"(render ms: avg {sum(render_ms) / len(render_ms):.0f}, "
+            f"p95 {render_ms[min(len(render_ms) - 1, int(len(render_ms) * 0.95))]}, "
+            f"max {render_ms[-1]})"
+        )
+
+        print("Slowest:")
+        for _, filename, ms in sorted(timings, key=lambda t: t[2], reverse=True)[:5]:
+            print(f"  {filename}  {ms} ms")
+
+    if failures:
+        print(f"\n{len(failures)} failed - run again to retry them:")
+        for estimate_id, filename, error in failures:
+            print(f"  {filename or estimate_id}: {error}")
+    elif os.path.exists(args.manifest):
+        # Finished cleanly - the next run starts from scratch
+        os.remove(args.manifest)
+
+
+if __name__ == "__main__":
+    main()
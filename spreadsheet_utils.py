@@ -0,0 +1,118 @@
+import csv
+from io import BytesIO, TextIOWrapper
+
+from openpyxl import Workbook, load_workbook
+
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv"
+}
+
+
+def read_xlsx_records(file, required_columns):
+    """
+    Stream the first sheet of an .xlsx file as (row number, {column: value}).
+
+    The workbook is opened read-only, so rows are parsed as they are
+    iterated and memory stays flat whatever the sheet size. The first row
+    is the header; only `required_columns` are returned, in any order.
+    Fully blank rows are skipped. Raises ValueError when a required
+    column is missing.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+
+        header = next(rows, None) or ()
+        positions = {
+            str(name).strip(): index
+            for index, name in enumerate(header)
+            if name is not None
+        }
+
+        missing = [col for col in required_columns if col not in positions]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+        for row_number, row in enumerate(rows, start=2):
+            if not any(value is not None and str(value).strip() for value in row):
+                continue
+
+            yield row_number, {
+                col: row[positions[col]] if positions[col] < len(row) else None
+                for col in required_columns
+            }
+    finally:
+        workbook.close()
+
+
+def read_csv_records(file, required_columns):
+    """read_xlsx_records() for a CSV file (binary file object, UTF-8)."""
+    text = TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        rows = csv.reader(text)
+
+        header = next(rows, None) or ()
+        positions = {name.strip(): index for index, name in enumerate(header)}
+
+        missing = [col for col in required_columns if col not in positions]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+        for row_number, row in enumerate(rows, start=2):
+            if not any(value.strip() for value in row):
+                continue
+
+            yield row_number, {
+                col: row[positions[col]] if positions[col] < len(row) else None
+                for col in required_columns
+            }
+    finally:
+        # Leave the caller's file open
+        text.detach()
+
+
+def read_records(file, file_name, required_columns):
+    """read_csv_records() or read_xlsx_records() by the file name's extension."""
+    if file_name.lower().endswith(".csv"):
+        return read_csv_records(file, required_columns)
+    return read_xlsx_records(file, required_columns)
+
+
+def write_xlsx(rows, columns, sheet_name="Sheet1"):
+    """
+    Write `columns` as the header and then each row of the `rows` iterable
+    to .xlsx bytes. openpyxl's write_only mode streams rows out as they
+    are appended instead of building the sheet in memory.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    sheet.append(list(columns))
+    for row in rows:
+        sheet.append(tuple(row))
+
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def write_csv(rows, columns):
+    """Same as write_xlsx() for CSV (UTF-8 with BOM so Excel reads it correctly)."""
+    output = BytesIO()
+    text = TextIOWrapper(output, encoding="utf-8-sig", newline="")
+
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(tuple(row))
+
+    text.flush()
+    return output.getvalue()
+
+
+def write_rows(rows, columns, file_format, sheet_name="Sheet1"):
+    """write_xlsx() or write_csv() by file_format ("xlsx" / "csv")."""
+    if file_format == "csv":
+        return write_csv(rows, columns)
+    return write_xlsx(rows, columns, sheet_name=sheet_name)
@@ -1,6 +1,11 @@
 import json
 import os
+import re
 import logging
+import threading
+from collections import ChainMap
+from functools import lru_cache
+from types import MappingProxyType
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
@@ -15,145 +20,259 @@ from num2words import num2words
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class TemplateManager:
-    def __init__(self):
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.load_settings()
-        logger.info("Template Manager initialized")
 
-    def load_settings(self):
-        try:
-            config_path = os.path.join(self.base_dir, 'config', 'template_settings.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    self.settings = json.load(f)
-                    logger.info("Settings loaded from %s", config_path)
-            else:
-                self.settings = {
-                    'template': 'Simple',
-                    'logo_path': '',
-                    'primary_color': '#000000',
-                    'font': 'Arial',
-                    'footer_text': '',
-                    'show_tax': True,
-                    'show_discount': True,
-                    'show_transport': False,
-                    'show_terms': True,
-                    'show_signature': False,
-                    'company_name': 'SRI RAMA STEEL AND CEMENT',
-                    'company_address': 'opposite TVS showroom, Warangal road, Huzurabad.',
-                    'company_phone': '8885482288',
-                    'company_gstin': '36AVBPT8804D1ZJ',
-                    'company_state': '36-Telangana'
-                }
-                # Create config directory if it doesn't exist
-                os.makedirs(os.path.dirname(config_path), exist_ok=True)
-                # Save default settings
-                with open(config_path, 'w') as f:
-                    json.dump(self.settings, f, indent=4)
-                logger.info("Created default settings at %s", config_path)
-        except Exception as e:
-            logger.error("Error loading template settings: %s", str(e))
-            self.settings = {}
+@lru_cache(maxsize=16)
+def _template_styles(primary_color_hex):
+    """Stylesheet for one primary colour - the only setting that affects it."""
+    styles = getSampleStyleSheet()
+
+    # Convert hex color to RGB
+    color_hex = primary_color_hex.lstrip('#')
+    primary_color = colors.Color(
+        int(color_hex[:2], 16) / 255,
+        int(color_hex[2:4], 16) / 255,
+        int(color_hex[4:], 16) / 255
+    )
+
+    # Create custom styles
+    styles.add(ParagraphStyle(
+        name='CompanyName',
+        parent=styles['Heading1'],
+        fontSize=20,
+        textColor=primary_color,
+        spaceAfter=10
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=primary_color,
+        spaceAfter=8
+    ))
+
+    styles.add(ParagraphStyle(
+        name='RightAlign',
+        parent=styles['Normal'],
+        alignment=TA_RIGHT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CenterAlign',
+        parent=styles['Normal'],
+        alignment=TA_CENTER
+    ))
+
+    return styles
+
+
+def _build_cell_styles():
+    """Paragraph styles used by the document sections, independent of the settings."""
+    normal = getSampleStyleSheet()['Normal']
+
+    def style(name, **kwargs):
+        return ParagraphStyle(name, parent=normal, **kwargs)
+
+    return {
+        # Header
+        'company_name': style('CompanyName', fontSize=20, fontName='Helvetica-Bold', alignment=1, spaceAfter=6),
+        'company_line': style('CompanyLine', fontSize=14, fontName='Helvetica', alignment=1, spaceAfter=2),
+        'company_state': style('State', fontSize=14, fontName='Helvetica', alignment=1, spaceAfter=6),
+        'section_heading': style('SectionHeading', fontSize=14, fontName='Helvetica-Bold', spaceAfter=1),
+        'customer_name': style('CustomerName', fontSize=13, fontName='Helvetica-Bold', spaceAfter=2),
+        'customer_detail': style('CustomerDetail', fontSize=13, fontName='Helvetica', spaceAfter=2),
+        'customer_address': style('CustomerAddress', fontSize=13, fontName='Helvetica', spaceAfter=2, leading=13),
+
+        # Items table
+        'item_header': style('Header', fontSize=13, fontName='Helvetica-Bold', alignment=TA_CENTER),
+        'item_name': style('ItemName', fontSize=13, fontName='Helvetica', alignment=TA_LEFT, leading=13),
+        'item_description': style(
+            'ItemDescription',
+            fontSize=8,  # Smaller font for description
+            fontName='Helvetica',
+            alignment=TA_LEFT,
+            leading=10,
+            textColor=colors.gray  # Gray color for description
+        ),
+        'item_number': style('Number', fontSize=13, fontName='Helvetica', alignment=TA_RIGHT),
+        'item_unit': style('Unit', fontSize=13, fontName='Helvetica', alignment=TA_CENTER),
+
+        # Totals and footer
+        'total_bold': style('TotalBold', fontSize=13, fontName='Helvetica-Bold', alignment=TA_RIGHT),
+        'small_heading': style('SmallHeading', fontSize=10, fontName='Helvetica-Bold'),
+        'body': style('Body', fontSize=10, fontName='Helvetica', leading=14),
+        'small_body': style('SmallBody', fontSize=9, fontName='Helvetica', leading=13),
+    }
+
+
+# Built once per process; reportlab only reads styles, so documents
+# rendered on different threads can share them
+CELL_STYLES = _build_cell_styles()
+
+# ---------------- TEMPLATE SETTINGS STORE ----------------
+# config/template_settings.json is read once per process and re-read only
+# when its mtime changes. Readers get an immutable snapshot, so every
+# TemplateManager (on any thread) can share it; per-render values are
+# layered on top without touching it.
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'config',
+    'template_settings.json'
+)
+
+DEFAULT_TEMPLATE_SETTINGS = {
+    'template': 'Simple',
+    'logo_path': '',
+    'primary_color': '#000000',
+    'font': 'Arial',
+    'footer_text': '',
+    'show_tax': True,
+    'show_discount': True,
+    'show_transport': False,
+    'show_terms': True,
+    'show_signature': False,
+    'company_name': 'SRI RAMA STEEL AND CEMENT',
+    'company_address': 'opposite TVS showroom, Warangal road, Huzurabad.',
+    'company_phone': '8885482288',
+    'company_gstin': '36AVBPT8804D1ZJ',
+    'company_state': '36-Telangana'
+}
+
+# Expected type of each known setting; unknown keys are kept as they are
+TEMPLATE_SETTINGS_SCHEMA = {
+    'template': str,
+    'logo_path': str,
+    'primary_color': str,
+    'font': str,
+    'footer_text': str,
+    'show_tax': bool,
+    'show_discount': bool,
+    'show_transport': bool,
+    'show_terms': bool,
+    'show_signature': bool,
+    'company_name': str,
+    'company_address': str,
+    'company_phone': str,
+    'company_gstin': str,
+    'company_state': str,
+    'terms_and_conditions': list,
+    'bank_details': dict
+}
+
+_HEX_COLOR = re.compile(r'^#?[0-9A-Fa-f]{6}$')
+
+_settings_lock = threading.Lock()
+_settings = {"mtime": None, "values": None}
+
+
+def validate_template_settings(settings):
+    """Return the valid settings; invalid values are logged and dropped."""
+    if not isinstance(settings, dict):
+        raise ValueError("template settings must be a JSON object")
+
+    valid = {}
+    for key, value in settings.items():
+        expected = TEMPLATE_SETTINGS_SCHEMA.get(key)
+
+        if expected is not None and not isinstance(value, expected):
+            logger.warning(
+                "Ignoring template setting %s: expected %s, got %r",
+                key, expected.__name__, value
+            )
+            continue
 
-    def get_template_style(self):
-        styles = getSampleStyleSheet()
-        
-        # Convert hex color to RGB
-        color_hex = self.settings.get('primary_color', '#2196F3').lstrip('#')
-        primary_color = colors.Color(
-            int(color_hex[:2], 16) / 255,
-            int(color_hex[2:4], 16) / 255,
-            int(color_hex[4:], 16) / 255
-        )
-
-        # Create custom styles
-        styles.add(ParagraphStyle(
-            name='CompanyName',
-            parent=styles['Heading1'],
-            fontSize=20,
-            textColor=primary_color,
-            spaceAfter=10
-        ))
+        if key == 'primary_color' and not _HEX_COLOR.match(value):
+            logger.warning("Ignoring template setting primary_color: %r is not #RRGGBB", value)
+            continue
 
-        styles.add(ParagraphStyle(
-            name='SectionHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=primary_color,
-            spaceAfter=8
-        ))
+        valid[key] = value
 
-        styles.add(ParagraphStyle(
-            name='RightAlign',
-            parent=styles['Normal'],
-            alignment=TA_RIGHT
-        ))
+    return valid
 
-        styles.add(ParagraphStyle(
-            name='CenterAlign',
-            parent=styles['Normal'],
-            alignment=TA_CENTER
-        ))
 
-        return styles
+def _load_template_settings():
+    if not os.path.exists(CONFIG_PATH):
+        # Create config directory and save the default settings
+        os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+        with open(CONFIG_PATH, 'w') as f:
+            json.dump(DEFAULT_TEMPLATE_SETTINGS, f, indent=4)
+        logger.info("Created default settings at %s", CONFIG_PATH)
+
+    mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    with open(CONFIG_PATH, 'r') as f:
+        values = validate_template_settings(json.load(f))
+
+    logger.info("Settings loaded from %s", CONFIG_PATH)
+    return {"mtime": mtime, "values": MappingProxyType(values)}
+
+
+def get_template_settings():
+    """Current template settings (read-only), reloaded when the file changes."""
+    global _settings
+
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    current = _settings
+    if current["values"] is not None and current["mtime"] == mtime:
+        return current["values"]
+
+    with _settings_lock:
+        if _settings["values"] is None or _settings["mtime"] != mtime:
+            try:
+                _settings = _load_template_settings()
+            except Exception as e:
+                logger.error("Error loading template settings: %s", str(e))
+                # Keep the last good settings (defaults on first load) until the file is fixed
+                if _settings["values"] is None:
+                    _settings = {"mtime": mtime, "values": MappingProxyType(dict(DEFAULT_TEMPLATE_SETTINGS))}
+                else:
+                    _settings = {"mtime": mtime, "values": _settings["values"]}
+
+        return _settings["values"]
+
+
+class TemplateManager:
+    def __init__(self):
+        # Settings of the render in progress (file settings + company_info),
+        # kept per thread so one TemplateManager can render on several
+        # threads at once
+        self._render = threading.local()
+        logger.info("Template Manager initialized")
+
+    @property
+    def settings(self):
+        settings = getattr(self._render, 'settings', None)
+        if settings is not None:
+            return settings
+        return get_template_settings()
+
+    def get_template_style(self):
+        return _template_styles(self.settings.get('primary_color', '#2196F3'))
 
     def create_header(self, doc, estimate_info):
         elements = []
         styles = self.get_template_style()
 
         # Company name in bold
-        elements.append(Paragraph(self.settings.get('company_name', 'SRI RAMA STEEL AND CEMENT'), ParagraphStyle(
-            'CompanyName',
-            parent=styles['Normal'],
-            fontSize=20,
-            fontName='Helvetica-Bold',
-            alignment=1,  # Center alignment
-            spaceAfter=6  # Increased spacing after company name
-        )))
+        elements.append(Paragraph(self.settings.get('company_name', 'SRI RAMA STEEL AND CEMENT'), CELL_STYLES['company_name']))
         
         # Add a small spacer
         elements.append(Spacer(1, 2 * mm))
         
         # Company address
-        elements.append(Paragraph(self.settings.get('company_address', ''), ParagraphStyle(
-            'Address',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica',
-            alignment=1,  # Center alignment
-            spaceAfter=2
-        )))
+        elements.append(Paragraph(self.settings.get('company_address', ''), CELL_STYLES['company_line']))
         
         # Company phone
-        elements.append(Paragraph(self.settings.get('company_phone', ''), ParagraphStyle(
-            'Phone',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica',
-            alignment=1,  # Center alignment
-            spaceAfter=2
-        )))
+        elements.append(Paragraph(self.settings.get('company_phone', ''), CELL_STYLES['company_line']))
         
         # Company GSTIN
-        elements.append(Paragraph(self.settings.get('company_gstin', ''), ParagraphStyle(
-            'GSTIN',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica',
-            alignment=1,  # Center alignment
-            spaceAfter=2
-        )))
+        elements.append(Paragraph(self.settings.get('company_gstin', ''), CELL_STYLES['company_line']))
         
         # Company State
-        elements.append(Paragraph(self.settings.get('company_state', ''), ParagraphStyle(
-            'State',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica',
-            alignment=1,  # Center alignment
-            spaceAfter=6
-        )))
+        elements.append(Paragraph(self.settings.get('company_state', ''), CELL_STYLES['company_state']))
         
         # Add horizontal line
         elements.append(HRFlowable(
@@ -166,20 +285,8 @@ class TemplateManager:
         ))
 
         # Create two-column layout for Bill To and Estimate Details
-        bill_to = Paragraph("Bill To", ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica-Bold',
-            spaceAfter=1
-        ))
-        estimate_title = Paragraph("Estimate Details", ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Normal'],
-            fontSize=14,
-            fontName='Helvetica-Bold',
-            spaceAfter=1
-        ))
+        bill_to = Paragraph("Bill To", CELL_STYLES['section_heading'])
+        estimate_title = Paragraph("Estimate Details", CELL_STYLES['section_heading'])
         
         # Get customer details directly from the parameter
         customer = estimate_info.get('customer', {})
@@ -189,23 +296,11 @@ class TemplateManager:
         
         # 1. Customer Name (in bold)
         if customer.get('name'):
-            customer_details.append(Paragraph(customer['name'], ParagraphStyle(
-                'CustomerName',
-                parent=styles['Normal'],
-                fontSize=13,
-                fontName='Helvetica-Bold',
-                spaceAfter=2
-            )))
+            customer_details.append(Paragraph(customer['name'], CELL_STYLES['customer_name']))
         
         # 2. Contact Number
         if customer.get('phone'):
-            customer_details.append(Paragraph(f"{customer['phone']}", ParagraphStyle(
-                'CustomerPhone',
-                parent=styles['Normal'],
-                fontSize=13,
-                fontName='Helvetica',
-                spaceAfter=2
-            )))
+            customer_details.append(Paragraph(f"{customer['phone']}", CELL_STYLES['customer_detail']))
         
         # 3. Address with city and state
         address_parts = []
@@ -221,34 +316,15 @@ class TemplateManager:
         if address_parts:
             customer_details.append(Paragraph(
                 "\n".join(address_parts),
-                ParagraphStyle(
-                    'CustomerAddress',
-                    parent=styles['Normal'],
-                    fontSize=13,
-                    fontName='Helvetica',
-                    spaceAfter=2,
-                    leading=13  # Adjust line spacing for address
-                )
+                CELL_STYLES['customer_address']
             ))
         
         # 4. Remaining details (GSTIN, Email)
         if customer.get('gstin'):
-            customer_details.append(Paragraph(f"GSTIN: {customer['gstin']}", ParagraphStyle(
-                'CustomerGSTIN',
-                parent=styles['Normal'],
-                fontSize=13,
-                fontName='Helvetica',
-                spaceAfter=2
-            )))
+            customer_details.append(Paragraph(f"GSTIN: {customer['gstin']}", CELL_STYLES['customer_detail']))
         
         if customer.get('email'):
-            customer_details.append(Paragraph(f"Email: {customer['email']}", ParagraphStyle(
-                'CustomerEmail',
-                parent=styles['Normal'],
-                fontSize=13,
-                fontName='Helvetica',
-                spaceAfter=2
-            )))
+            customer_details.append(Paragraph(f"Email: {customer['email']}", CELL_STYLES['customer_detail']))
             
         # If no customer details, add placeholder
         if not customer_details:
@@ -302,8 +378,6 @@ class TemplateManager:
     def create_items_table(self, items, doc):
         """Create the items table section."""
         try:
-            styles = self.get_template_style()
-
             # Define column headers and widths
             headers = ['Item & Description', 'Qty', 'Unit', 'Rate', 'Amount']
             col_widths = [
@@ -316,13 +390,7 @@ class TemplateManager:
 
             # Create table data starting with headers
             table_data = [[
-                Paragraph(header, ParagraphStyle(
-                    'Header',
-                    parent=styles['Normal'],
-                    fontSize=13,
-                    fontName='Helvetica-Bold',
-                    alignment=TA_CENTER
-                )) for header in headers
+                Paragraph(header, CELL_STYLES['item_header']) for header in headers
             ]]
 
             # Add items
@@ -346,59 +414,20 @@ class TemplateManager:
 
                 # Create item name and description with different styles
                 item_text = [
-                    Paragraph(name, ParagraphStyle(
-                        'ItemName',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica',
-                        alignment=TA_LEFT,
-                        leading=13
-                    ))
+                    Paragraph(name, CELL_STYLES['item_name'])
                 ]
                 
                 if description:
                     item_text.append(
-                        Paragraph(description, ParagraphStyle(
-                            'ItemDescription',
-                            parent=styles['Normal'],
-                            fontSize=8,  # Smaller font for description
-                            fontName='Helvetica',
-                            alignment=TA_LEFT,
-                            leading=10,
-                            textColor=colors.gray  # Gray color for description
-                        ))
+                        Paragraph(description, CELL_STYLES['item_description'])
                     )
                 
                 row = [
                     item_text,  # List of Paragraphs for name and description
-                    Paragraph(str(quantity), ParagraphStyle(
-                        'Number',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica',
-                        alignment=TA_RIGHT
-                    )),
-                    Paragraph(unit, ParagraphStyle(
-                        'Unit',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica',
-                        alignment=TA_CENTER
-                    )),
-                    Paragraph(f"{rate:,.2f}", ParagraphStyle(
-                        'Number',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica',
-                        alignment=TA_RIGHT
-                    )),
-                    Paragraph(f"{amount:,.2f}", ParagraphStyle(
-                        'Number',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica',
-                        alignment=TA_RIGHT
-                    ))
+                    Paragraph(str(quantity), CELL_STYLES['item_number']),
+                    Paragraph(unit, CELL_STYLES['item_unit']),
+                    Paragraph(f"{rate:,.2f}", CELL_STYLES['item_number']),
+                    Paragraph(f"{amount:,.2f}", CELL_STYLES['item_number'])
                 ]
                 table_data.append(row)
                 items_subtotal += amount
@@ -441,7 +470,6 @@ class TemplateManager:
         """Create the totals section of the document."""
         try:
             elements = []
-            styles = self.get_template_style()
 
             # Calculate totals
             subtotal = totals.get('subtotal', 0)
@@ -470,32 +498,14 @@ class TemplateManager:
                 discount_label = f"Discount ({discount_value}%)" if discount_type == 'percentage' else 'Discount'
                 discount_amount = (subtotal * discount_value / 100) if discount_type == 'percentage' else discount_value
                 totals_data.append([
-                    Paragraph(discount_label, ParagraphStyle(
-                        'DiscountLabel',
-                        parent=styles['Normal'],
-                        fontSize=13,
-                        fontName='Helvetica-Bold',
-                        alignment=TA_RIGHT
-                    )),
+                    Paragraph(discount_label, CELL_STYLES['total_bold']),
                     f"{discount_amount:,.2f}"
                 ])
             
             # Always show grand total
             totals_data.append([
-                Paragraph('Grand Total:', ParagraphStyle(
-                    'GrandTotalLabel',
-                    parent=styles['Normal'],
-                    fontSize=13,
-                    fontName='Helvetica-Bold',
-                    alignment=TA_RIGHT
-                )),
-                Paragraph(f"{total_amount:,.2f}", ParagraphStyle(
-                    'GrandTotalAmount',
-                    parent=styles['Normal'],
-                    fontSize=13,
-                    fontName='Helvetica-Bold',
-                    alignment=TA_RIGHT
-                ))
+                Paragraph('Grand Total:', CELL_STYLES['total_bold']),
+                Paragraph(f"{total_amount:,.2f}", CELL_STYLES['total_bold'])
             ])
 
             # Calculate column widths based on page width
@@ -525,19 +535,8 @@ class TemplateManager:
                 amount_in_words += f" And {num2words(paise, lang='en_IN')} Paise"
             amount_in_words += " Only"
 
-            elements.append(Paragraph("Amount In Words:", ParagraphStyle(
-                'AmountTitle',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName='Helvetica-Bold'
-            )))
-            elements.append(Paragraph(amount_in_words, ParagraphStyle(
-                'AmountWords',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName='Helvetica',
-                leading=14
-            )))
+            elements.append(Paragraph("Amount In Words:", CELL_STYLES['small_heading']))
+            elements.append(Paragraph(amount_in_words, CELL_STYLES['body']))
 
             return elements
 
@@ -549,52 +548,24 @@ class TemplateManager:
         """Create the footer section of the document."""
         try:
             elements = []
-            styles = self.get_template_style()
 
             # Add notes if present
             if totals.get('note'):
                 elements.append(Spacer(1, 5 * mm))
-                elements.append(Paragraph("Notes:", ParagraphStyle(
-                    'NotesTitle',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    fontName='Helvetica-Bold'
-                )))
-                elements.append(Paragraph(totals['note'], ParagraphStyle(
-                    'Notes',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    fontName='Helvetica',
-                    leading=14
-                )))
+                elements.append(Paragraph("Notes:", CELL_STYLES['small_heading']))
+                elements.append(Paragraph(totals['note'], CELL_STYLES['body']))
             
             # Add Terms and Conditions
             if self.settings.get('show_terms', True) and self.settings.get('terms_and_conditions'):
                 elements.append(Spacer(1, 5 * mm))
-                elements.append(Paragraph("Terms and Conditions:", ParagraphStyle(
-                    'TermsTitle',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    fontName='Helvetica-Bold'
-                )))
+                elements.append(Paragraph("Terms and Conditions:", CELL_STYLES['small_heading']))
                 terms_text = "<br/>".join(self.settings['terms_and_conditions'])
-                elements.append(Paragraph(terms_text, ParagraphStyle(
-                    'Terms',
-                    parent=styles['Normal'],
-                    fontSize=9,
-                    fontName='Helvetica',
-                    leading=13
-                )))
+                elements.append(Paragraph(terms_text, CELL_STYLES['small_body']))
 
             # Add Bank Details
             if self.settings.get('bank_details'):
                 elements.append(Spacer(1, 5 * mm))
-                elements.append(Paragraph("Bank Details:", ParagraphStyle(
-                    'BankTitle',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    fontName='Helvetica-Bold'
-                )))
+                elements.append(Paragraph("Bank Details:", CELL_STYLES['small_heading']))
                 bank_details = self.settings['bank_details']
                 bank_text = f"""
                 Bank Name: {bank_details.get('bank_name', '')}<br/>
@@ -603,13 +574,7 @@ class TemplateManager:
                 IFSC Code: {bank_details.get('ifsc_code', '')}<br/>
                 Branch: {bank_details.get('branch', '')}
                 """
-                elements.append(Paragraph(bank_text, ParagraphStyle(
-                    'BankDetails',
-                    parent=styles['Normal'],
-                    fontSize=9,
-                    fontName='Helvetica',
-                    leading=13
-                )))
+                elements.append(Paragraph(bank_text, CELL_STYLES['small_body']))
             
             # Add signature section if enabled
             if self.settings.get('show_signature', False):
@@ -685,15 +650,15 @@ class TemplateManager:
     def generate_estimate_pdf(self, estimate, customer, items, filename, company_info, notes, totals):
         """Generate a PDF estimate."""
         try:
-            # Update settings with company info
-            if company_info:
-                self.settings.update(company_info)
-            
-            # Add notes to estimate info
+            # One settings snapshot for the whole document; company info
+            # applies to this render only
+            self._render.settings = ChainMap(dict(company_info or {}), get_template_settings())
+
+            # Add notes and customer details to a copy of the estimate info
+            estimate = dict(estimate)
             if notes:
                 estimate['notes'] = notes
 
-            # Ensure customer details are in estimate_info
             if 'customer' not in estimate:
                 estimate['customer'] = customer
             
@@ -714,4 +679,6 @@ class TemplateManager:
             
         except Exception as e:
             logger.error(f"Error generating PDF: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+        finally:
+            self._render.settings = None 
\ No newline at end of file
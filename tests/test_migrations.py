@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from db.migrations import MIGRATIONS, get_schema_version, migrate
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "invoicing.db", isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    # Baseline schema, before any migration ran
+    conn.executescript(MIGRATIONS[0])
+    yield conn
+    conn.close()
+
+
+def test_duplicate_estimate_numbers_get_their_own_pdf_path(conn):
+    conn.executescript("""
+        INSERT INTO estimates (estimate_no, date, pdf_path)
+        VALUES ('SRS001', '2025-01-01', 'bills/SRS001.pdf'),
+               ('SRS001', '2025-01-02', 'bills/SRS001.pdf');
+    """)
+
+    migrate(conn)
+
+    rows = [
+        dict(row) for row in
+        conn.execute("SELECT id, estimate_no, pdf_path FROM estimates ORDER BY id")
+    ]
+    assert rows == [
+        {"id": 1, "estimate_no": "SRS001", "pdf_path": "bills/SRS001.pdf"},
+        {"id": 2, "estimate_no": "SRS001-2", "pdf_path": "bills/SRS001-2.pdf"},
+    ]
+    assert get_schema_version(conn) == len(MIGRATIONS)
+
+
+def test_duplicate_item_and_customer_names_are_renamed(conn):
+    conn.executescript("""
+        INSERT INTO items (name) VALUES ('Cement'), ('Cement');
+        INSERT INTO customers (name) VALUES ('Ravi'), ('Ravi');
+    """)
+
+    migrate(conn)
+
+    assert [row[0] for row in conn.execute("SELECT name FROM items ORDER BY id")] == [
+        "Cement", "Cement (2)"
+    ]
+    assert [row[0] for row in conn.execute("SELECT name FROM customers ORDER BY id")] == [
+        "Ravi", "Ravi (2)"
+    ]
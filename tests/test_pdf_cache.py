@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from utilities import pdf_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_cache, "_disk_bytes", None)
+    monkeypatch.setattr(pdf_cache, "_entries", pdf_cache.OrderedDict())
+    monkeypatch.setattr(pdf_cache, "_memory_bytes", 0)
+    return tmp_path
+
+
+def _disk_size(path):
+    return sum(os.path.getsize(path / name) for name in os.listdir(path))
+
+
+def test_disk_store_is_pruned_past_the_cap(cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "MAX_DISK_BYTES", 10_000)
+
+    for i in range(30):
+        key = f"{i:064x}"
+        pdf_cache.put(key, b"x" * 1_000)
+        # Distinct mtimes so the oldest entries go first
+        os.utime(pdf_cache._disk_path(key), (i, i))
+
+    assert _disk_size(cache_dir) <= 10_000
+
+    assert os.path.exists(pdf_cache._disk_path(f"{29:064x}"))
+    assert not os.path.exists(pdf_cache._disk_path(f"{0:064x}"))
+
+
+def test_prune_disk_shrinks_to_a_smaller_cap(cache_dir):
+    for i in range(10):
+        pdf_cache.put(f"{i:064x}", b"x" * 1_000)
+
+    assert pdf_cache.prune_disk(max_bytes=3_000) <= 3_000
+    assert _disk_size(cache_dir) <= 3_000
+
+
+def test_other_layout_versions_are_purged(cache_dir):
+    stale = cache_dir / f"v{pdf_cache.PDF_LAYOUT_VERSION + 1}-{'a' * 64}.pdf"
+    legacy = cache_dir / f"{'b' * 64}.pdf"
+    stale.write_bytes(b"old")
+    legacy.write_bytes(b"old")
+
+    pdf_cache.put("c" * 64, b"new")
+
+    assert not stale.exists()
+    assert not legacy.exists()
+    assert pdf_cache.get("c" * 64) == b"new"
@@ -0,0 +1,37 @@
+from utilities import pdf_worker
+
+
+def _status(pdf_path, pdf_status):
+    return {
+        "estimate_no": "SRS001",
+        "pdf_path": str(pdf_path),
+        "pdf_status": pdf_status,
+        "pdf_render_ms": 10,
+        "pdf_error": None
+    }
+
+
+def _fail_render(render_args):
+    raise AssertionError("rendered although the file was ready")
+
+
+def test_ready_pdf_is_read_from_disk(tmp_path, monkeypatch):
+    path = tmp_path / "SRS001.pdf"
+    path.write_bytes(b"%PDF-saved")
+    monkeypatch.setattr(pdf_worker, "get_pdf_status", lambda estimate_id: _status(path, "ready"))
+    monkeypatch.setattr(pdf_worker, "estimate_render_args", _fail_render)
+
+    assert pdf_worker.get_estimate_pdf(1) == b"%PDF-saved"
+
+
+def test_missing_or_unfinished_pdf_is_rendered(tmp_path, monkeypatch):
+    path = tmp_path / "SRS001.pdf"
+    path.write_bytes(b"%PDF-old")
+    monkeypatch.setattr(pdf_worker, "estimate_render_args", lambda estimate_id: {})
+    monkeypatch.setattr(pdf_worker, "render_pdf", lambda render_args: (b"%PDF-new", False))
+
+    monkeypatch.setattr(pdf_worker, "get_pdf_status", lambda estimate_id: _status(path, "rendering"))
+    assert pdf_worker.get_estimate_pdf(1) == b"%PDF-new"
+
+    monkeypatch.setattr(pdf_worker, "get_pdf_status", lambda estimate_id: _status(tmp_path / "gone.pdf", "ready"))
+    assert pdf_worker.get_estimate_pdf(1) == b"%PDF-new"